@@ -22,13 +22,16 @@
 
 import os
 import sys
+from pathlib import Path
 import time
 import logging
+from logging.handlers import MemoryHandler
 import argparse
 from typing import Dict, Any
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# 项目根目录，模块级计算一次（resolve一次系统调用即可），各处直接复用
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
 from scheduler.dag import Workflow
 from scheduler.task import ShellTask, PythonTask
@@ -132,53 +135,58 @@ def main():
     """主函数"""
     # 解析命令行参数
     args = parse_args()
-    
-    # 设置日志
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
+
+    # 设置日志：MemoryHandler批量缓冲日志记录，写满或遇到ERROR时才整批刷到stderr，
+    # 避免每条进度日志各自触发一次写系统调用
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    memory_handler = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=stream_handler)
+    logging.basicConfig(level=logging.INFO, handlers=[memory_handler])
+    logger = logging.getLogger("alert_example")
+
     # 创建工作流
     workflow = create_workflow()
-    
+
     # 启用飞书告警
     workflow.enable_feishu_alert(args.webhook_url, at_all=args.at_all)
-    
+
     # 可视化工作流
     if args.visualize:
         try:
-            print("可视化工作流...")
+            logger.info("可视化工作流...")
             workflow.visualize("alert_workflow")
         except Exception as e:
-            print(f"可视化失败: {str(e)}")
-    
+            logger.error("可视化失败: %s", str(e))
+
     try:
         # 输出工作流的串并联关系
-        print("\n工作流的任务依赖关系:")
+        logger.info("工作流的任务依赖关系:")
         task_levels = workflow.dag.topological_sort()
         for i, level in enumerate(task_levels):
-            print(f"  第{i+1}层 (并行执行): {level}")
-            
+            logger.info("  第%d层 (并行执行): %s", i + 1, level)
+
         # 执行工作流
-        print("\n开始执行工作流...")
+        logger.info("开始执行工作流...")
         workflow.execute()
-        
+
     except Exception as e:
-        print(f"\n工作流执行失败: {str(e)}")
-        
+        logger.error("工作流执行失败: %s", str(e))
+
         # 打印执行历史
         history = workflow.get_execution_history()[-1]  # 最后一次执行记录
-        print("\n执行历史:")
-        print(f"  开始时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history['start_time']))}")
-        print(f"  结束时间: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history['end_time']))}")
-        print(f"  耗时: {history['duration']:.2f} 秒")
-        print(f"  状态: {history['status']}")
-        print(f"  已完成任务: {history['completed_tasks']}")
-        print(f"  失败任务: {history['failed_task_id']}")
-        print(f"  错误信息: {history['error_message']}")
-        
-        print("\n飞书告警已发送，请检查机器人消息。")
+        logger.info("执行历史:")
+        logger.info("  开始时间: %s", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history['start_time'])))
+        logger.info("  结束时间: %s", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(history['end_time'])))
+        logger.info("  耗时: %.2f 秒", history['duration'])
+        logger.info("  状态: %s", history['status'])
+        logger.info("  已完成任务: %s", history['completed_tasks'])
+        logger.info("  失败任务: %s", history['failed_task_id'])
+        logger.info("  错误信息: %s", history['error_message'])
+
+        logger.info("飞书告警已发送，请检查机器人消息。")
+    finally:
+        # 退出前整批刷出缓冲中的日志
+        memory_handler.flush()
 
 
 if __name__ == "__main__":
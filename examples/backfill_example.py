@@ -31,12 +31,15 @@ python backfill_example.py
 
 import os
 import sys
+from pathlib import Path
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-# 将项目根目录添加到路径
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, project_root)
+# 项目根目录与示例配置文件路径，模块级计算一次，各示例直接复用
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+CONFIG_FILE = str(PROJECT_ROOT / "config" / "screenrecog_workflow.json")
 
 # 导入回溯相关函数
 from scheduler_cli import (
@@ -65,21 +68,10 @@ def example_1_backfill_by_day():
         }
     }
     
-    # 将参数写入临时文件
-    params_file = os.path.join(project_root, "temp_day_params.json")
-    with open(params_file, 'w', encoding='utf-8') as f:
-        json.dump(backfill_params, f, indent=4)
-    
-    try:
-        # 执行回溯
-        config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-        success = run_backfill(config_file, params_file)
-        
-        print(f"按天回溯{'成功' if success else '失败'}")
-    finally:
-        # 删除临时文件
-        if os.path.exists(params_file):
-            os.remove(params_file)
+    # 直接传入参数字典执行回溯，无需写临时文件
+    success = run_backfill(CONFIG_FILE, backfill_params=backfill_params)
+
+    print(f"按天回溯{'成功' if success else '失败'}")
 
 
 def example_2_backfill_by_week():
@@ -98,21 +90,10 @@ def example_2_backfill_by_week():
         }
     }
     
-    # 将参数写入临时文件
-    params_file = os.path.join(project_root, "temp_week_params.json")
-    with open(params_file, 'w', encoding='utf-8') as f:
-        json.dump(backfill_params, f, indent=4)
-    
-    try:
-        # 执行回溯
-        config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-        success = run_backfill(config_file, params_file)
-        
-        print(f"按周回溯{'成功' if success else '失败'}")
-    finally:
-        # 删除临时文件
-        if os.path.exists(params_file):
-            os.remove(params_file)
+    # 直接传入参数字典执行回溯，无需写临时文件
+    success = run_backfill(CONFIG_FILE, backfill_params=backfill_params)
+
+    print(f"按周回溯{'成功' if success else '失败'}")
 
 
 def example_3_backfill_by_month():
@@ -131,21 +112,10 @@ def example_3_backfill_by_month():
         }
     }
     
-    # 将参数写入临时文件
-    params_file = os.path.join(project_root, "temp_month_params.json")
-    with open(params_file, 'w', encoding='utf-8') as f:
-        json.dump(backfill_params, f, indent=4)
-    
-    try:
-        # 执行回溯
-        config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-        success = run_backfill(config_file, params_file)
-        
-        print(f"按月回溯{'成功' if success else '失败'}")
-    finally:
-        # 删除临时文件
-        if os.path.exists(params_file):
-            os.remove(params_file)
+    # 直接传入参数字典执行回溯，无需写临时文件
+    success = run_backfill(CONFIG_FILE, backfill_params=backfill_params)
+
+    print(f"按月回溯{'成功' if success else '失败'}")
 
 
 def example_4_backfill_with_custom_dates():
@@ -167,21 +137,10 @@ def example_4_backfill_with_custom_dates():
         }
     }
     
-    # 将参数写入临时文件
-    params_file = os.path.join(project_root, "temp_custom_dates_params.json")
-    with open(params_file, 'w', encoding='utf-8') as f:
-        json.dump(backfill_params, f, indent=4)
-    
-    try:
-        # 执行回溯
-        config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-        success = run_backfill(config_file, params_file)
-        
-        print(f"自定义日期列表回溯{'成功' if success else '失败'}")
-    finally:
-        # 删除临时文件
-        if os.path.exists(params_file):
-            os.remove(params_file)
+    # 直接传入参数字典执行回溯，无需写临时文件
+    success = run_backfill(CONFIG_FILE, backfill_params=backfill_params)
+
+    print(f"自定义日期列表回溯{'成功' if success else '失败'}")
 
 
 def example_5_backfill_specific_tasks():
@@ -199,22 +158,11 @@ def example_5_backfill_specific_tasks():
         }
     }
     
-    # 将参数写入临时文件
-    params_file = os.path.join(project_root, "temp_specific_tasks_params.json")
-    with open(params_file, 'w', encoding='utf-8') as f:
-        json.dump(backfill_params, f, indent=4)
-    
-    try:
-        # 执行回溯，指定特定任务ID
-        config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-        job_ids = "data_quality_check,notify_completion"
-        success = run_backfill(config_file, params_file, job_ids.split(","))
-        
-        print(f"回溯特定任务{'成功' if success else '失败'}")
-    finally:
-        # 删除临时文件
-        if os.path.exists(params_file):
-            os.remove(params_file)
+    # 直接传入参数字典执行回溯，指定特定任务ID
+    job_ids = "data_quality_check,notify_completion"
+    success = run_backfill(CONFIG_FILE, backfill_params=backfill_params, job_ids=job_ids)
+
+    print(f"回溯特定任务{'成功' if success else '失败'}")
 
 
 def example_6_direct_backfill():
@@ -222,8 +170,7 @@ def example_6_direct_backfill():
     print("\n=== 示例6: 直接使用参数回溯 ===")
     
     # 加载工作流配置
-    config_file = os.path.join(project_root, "config/screenrecog_workflow.json")
-    workflow_config = load_json_file(config_file)
+    workflow_config = load_json_file(CONFIG_FILE)
     
     # 获取日期范围
     date_range = get_date_range("2024-01-01", "2024-01-03")
@@ -243,15 +190,22 @@ def example_6_direct_backfill():
 def main():
     """运行所有示例"""
     print("开始运行数据回溯示例...")
-    
-    # 运行示例
-    example_1_backfill_by_day()
-    example_2_backfill_by_week()
-    example_3_backfill_by_month()
-    example_4_backfill_with_custom_dates()
-    example_5_backfill_specific_tasks()
-    example_6_direct_backfill()
-    
+
+    # 六个示例互相独立（不同日期范围、dry_run模式），可以并行运行，
+    # 总耗时从各示例之和降为最慢示例的耗时。
+    # 由于工作流内部可能派生子进程，这里使用线程池而非进程池，避免pickle问题
+    examples = [
+        example_1_backfill_by_day,
+        example_2_backfill_by_week,
+        example_3_backfill_by_month,
+        example_4_backfill_with_custom_dates,
+        example_5_backfill_specific_tasks,
+        example_6_direct_backfill,
+    ]
+    with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+        for future in [executor.submit(fn) for fn in examples]:
+            future.result()
+
     print("\n所有示例运行完成!")
 
 
@@ -39,8 +39,29 @@ python backfill_with_different_date_formats.py
 import json
 import os
 from datetime import datetime, timedelta
+from pathlib import Path
 from scheduler_dag.scheduler_cli import run_backfill
 
+# 配置目录在模块加载时解析一次，避免每次调用重复拼接路径
+_ROOT = Path(__file__).resolve().parents[1]
+_CONFIG_DIR = _ROOT / 'config'
+
+# orjson为可选依赖，安装后JSON解析/序列化更快；未安装时退回标准库json
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2)
+
+    def _json_loads(data):
+        return json.loads(data)
+
 
 def backfill_with_different_date_formats(config_mode='json'):
     """使用多种日期格式进行回填的详细示例
@@ -52,13 +73,12 @@ def backfill_with_different_date_formats(config_mode='json'):
     
     if config_mode == 'json':
         # 使用JSON配置文件
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                  "config", "backfill_params_example.json")
-        
+        config_path = _CONFIG_DIR / "backfill_params_example.json"
+
         print(f"\n从配置文件 {config_path} 加载参数:")
-        with open(config_path, 'r') as f:
-            backfill_params = json.load(f)
-            print(json.dumps(backfill_params, indent=2))
+        with config_path.open('r', encoding='utf-8') as f:
+            backfill_params = _json_loads(f.read())
+            print(_json_dumps(backfill_params))
         
         # 执行基于配置文件的回填
         run_backfill(
@@ -101,7 +121,7 @@ def backfill_with_different_date_formats(config_mode='json'):
         }
         
         print("\n使用代码构建的配置参数:")
-        print(json.dumps(backfill_params, indent=2))
+        print(_json_dumps(backfill_params))
         
         # 执行回填
         run_backfill(
@@ -146,19 +166,15 @@ def print_date_formats_examples():
     print("-" * 100)
     
     for fmt, desc in formats.items():
+        if "%q" in fmt:  # 季度格式strftime不支持，提前判断并手动计算，避免走异常控制流
+            formatted_dates = [f"{d.year}-Q{(d.month - 1) // 3 + 1}" for d in dates]
+            print(f"{fmt:22} | {desc:40} | {formatted_dates[0]:20} | {formatted_dates[1]:20} | {formatted_dates[2]:20}")
+            continue
         try:
             formatted_dates = [d.strftime(fmt) for d in dates]
             print(f"{fmt:22} | {desc:40} | {formatted_dates[0]:20} | {formatted_dates[1]:20} | {formatted_dates[2]:20}")
         except Exception as e:
-            if "%q" in fmt:  # 季度格式需要特殊处理
-                # 手动计算季度
-                quarters = []
-                for d in dates:
-                    quarter = (d.month - 1) // 3 + 1
-                    quarters.append(f"{d.year}-Q{quarter}")
-                print(f"{fmt:22} | {desc:40} | {quarters[0]:20} | {quarters[1]:20} | {quarters[2]:20}")
-            else:
-                print(f"{fmt:22} | {desc:40} | 格式错误: {str(e):60}")
+            print(f"{fmt:22} | {desc:40} | 格式错误: {str(e):60}")
 
 
 def create_sample_config():
@@ -192,12 +208,11 @@ def create_sample_config():
         }
     }
     
-    config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
-    os.makedirs(config_dir, exist_ok=True)
-    
-    config_path = os.path.join(config_dir, "date_formats_sample.json")
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    _CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+
+    config_path = _CONFIG_DIR / "date_formats_sample.json"
+    with config_path.open('w', encoding='utf-8') as f:
+        f.write(_json_dumps(config))
     
     print(f"\n示例配置文件已创建: {config_path}")
 
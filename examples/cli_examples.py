@@ -40,100 +40,80 @@ from datetime import datetime, timedelta
 以下为命令行工具使用示例，包括各种常见场景的命令和解释
 """
 
-def print_command(cmd, description):
-    """打印命令及其描述"""
-    print(f"\n{'=' * 80}")
-    print(f"# {description}")
-    print(f"{'=' * 80}")
-    print(f"{cmd}")
-    print(f"{'=' * 80}")
+# 示例工作流配置文件
+WORKFLOW_CONFIG = "./config/screenrecog_workflow.json"
 
-
-def main():
-    # 示例工作流配置文件
-    workflow_config = "./config/screenrecog_workflow.json"
-    
-    # 1. 执行单个工作流
-    print_command(
-        f"python scheduler_cli.py run --config {workflow_config}",
+# 所有示例命令及说明，模块导入时构建一次
+COMMANDS = (
+    (
+        f"python scheduler_cli.py run --config {WORKFLOW_CONFIG}",
         "基本用法：执行整个工作流"
-    )
-    
-    # 2. 使用参数执行工作流
-    print_command(
-        f"python scheduler_cli.py run --config {workflow_config} --params ./config/params_example.json",
+    ),
+    (
+        f"python scheduler_cli.py run --config {WORKFLOW_CONFIG} --params ./config/params_example.json",
         "使用参数文件执行工作流"
-    )
-    
-    # 3. 只执行特定任务
-    print_command(
-        f"python scheduler_cli.py run --config {workflow_config} --job_ids screen_event_detail,user_behavior_analyze",
+    ),
+    (
+        f"python scheduler_cli.py run --config {WORKFLOW_CONFIG} --job_ids screen_event_detail,user_behavior_analyze",
         "只执行指定的任务"
-    )
-    
-    # 4. 按天回溯数据
-    print_command(
-        f"python scheduler_cli.py backfill --config {workflow_config} --backfill_params ./config/backfill_params_example.json",
+    ),
+    (
+        f"python scheduler_cli.py backfill --config {WORKFLOW_CONFIG} --backfill_params ./config/backfill_params_example.json",
         "按天回溯数据"
-    )
-    
-    # 5. 按周回溯数据
-    print_command(
-        f"python scheduler_cli.py backfill --config {workflow_config} --backfill_params ./config/backfill_params_week_example.json",
+    ),
+    (
+        f"python scheduler_cli.py backfill --config {WORKFLOW_CONFIG} --backfill_params ./config/backfill_params_week_example.json",
         "按周回溯数据"
-    )
-    
-    # 6. 按月回溯数据
-    print_command(
-        f"python scheduler_cli.py backfill --config {workflow_config} --backfill_params ./config/backfill_params_month_example.json",
+    ),
+    (
+        f"python scheduler_cli.py backfill --config {WORKFLOW_CONFIG} --backfill_params ./config/backfill_params_month_example.json",
         "按月回溯数据"
-    )
-    
-    # 7. 使用自定义日期列表回溯数据
-    print_command(
-        f"python scheduler_cli.py backfill --config {workflow_config} --backfill_params ./config/backfill_params_custom_dates_example.json",
+    ),
+    (
+        f"python scheduler_cli.py backfill --config {WORKFLOW_CONFIG} --backfill_params ./config/backfill_params_custom_dates_example.json",
         "使用自定义日期列表回溯数据"
-    )
-    
-    # 8. 回溯时只执行特定任务
-    print_command(
-        f"python scheduler_cli.py backfill --config {workflow_config} --backfill_params ./config/backfill_params_example.json --job_ids data_quality_check",
+    ),
+    (
+        f"python scheduler_cli.py backfill --config {WORKFLOW_CONFIG} --backfill_params ./config/backfill_params_example.json --job_ids data_quality_check",
         "回溯时只执行特定任务"
-    )
-    
-    # 9. 可视化工作流
-    print_command(
-        f"python scheduler_cli.py visualize --config {workflow_config}",
+    ),
+    (
+        f"python scheduler_cli.py visualize --config {WORKFLOW_CONFIG}",
         "可视化工作流（默认输出到output目录）"
-    )
-    
-    # 10. 可视化并指定输出路径
-    print_command(
-        f"python scheduler_cli.py visualize --config {workflow_config} --output ./output/my_workflow.png",
+    ),
+    (
+        f"python scheduler_cli.py visualize --config {WORKFLOW_CONFIG} --output ./output/my_workflow.png",
         "可视化工作流并指定输出路径"
-    )
-    
-    # 11. 查看工作流信息
-    print_command(
-        f"python scheduler_cli.py info --config {workflow_config}",
+    ),
+    (
+        f"python scheduler_cli.py info --config {WORKFLOW_CONFIG}",
         "查看工作流信息"
-    )
-    
-    # 12. 帮助命令
-    print_command(
+    ),
+    (
         "python scheduler_cli.py -h",
         "查看命令行工具帮助信息"
-    )
-    
-    print_command(
+    ),
+    (
         "python scheduler_cli.py run -h",
         "查看run子命令帮助信息"
-    )
-    
-    print_command(
+    ),
+    (
         "python scheduler_cli.py backfill -h",
         "查看backfill子命令帮助信息"
-    )
+    ),
+)
+
+
+def format_command(cmd, description):
+    """格式化命令及其描述，返回字符串而非直接打印"""
+    separator = '=' * 80
+    return f"\n{separator}\n# {description}\n{separator}\n{cmd}\n{separator}\n"
+
+
+def main():
+    # 将全部示例拼成一个字符串后一次性写出，
+    # 避免每条命令三次print各自触发一次写系统调用
+    sys.stdout.write(''.join(format_command(cmd, desc) for cmd, desc in COMMANDS))
 
 
 if __name__ == "__main__":
@@ -22,13 +22,15 @@ python config_workflow_example.py --config ../config/screenrecog_workflow.json [
 
 import os
 import sys
+from pathlib import Path
 import argparse
 import datetime
 import logging
 from typing import Dict, Any
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# 项目根目录，模块级计算一次（resolve一次系统调用即可），各处直接复用
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
 from scheduler.config import WorkflowConfig
 
@@ -61,7 +63,9 @@ def main():
         if not day_id:
             # 默认使用昨天的日期
             day_id = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-            
+        # 无破折号格式只计算一次，后续参数展开和可视化路径直接复用
+        day_id_no_dash = day_id.replace("-", "")
+
         logger.info(f"使用日期: {day_id}")
         
         # 加载配置文件
@@ -74,7 +78,7 @@ def main():
         # 创建工作流实例
         override_params = {
             "day_id": day_id,
-            "day_id_no_dash": day_id.replace("-", "")
+            "day_id_no_dash": day_id_no_dash
         }
         
         workflow = workflow_config.create_workflow(override_params=override_params)
@@ -90,7 +94,7 @@ def main():
                 output_dir = os.path.abspath(args.output_dir)
                 os.makedirs(output_dir, exist_ok=True)
                 
-                vis_path = os.path.join(output_dir, f"workflow_{day_id.replace('-', '')}")
+                vis_path = os.path.join(output_dir, f"workflow_{day_id_no_dash}")
                 logger.info(f"正在生成工作流可视化: {vis_path}")
                 
                 workflow.visualize(vis_path)
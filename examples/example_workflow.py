@@ -22,11 +22,13 @@
 
 import os
 import sys
+from pathlib import Path
 import logging
 from typing import Dict, Any
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# 项目根目录，模块级计算一次（resolve一次系统调用即可），各处直接复用
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
 from scheduler.dag import Workflow
 from scheduler.task import (
@@ -130,8 +132,10 @@ def main():
     
     try:
         # 可视化工作流（如果安装了graphviz）
-        workflow.visualize()
-        
+        # 默认跳过，避免无条件启动graphviz渲染子进程，需要时设置VISUALIZE环境变量开启
+        if os.environ.get('VISUALIZE'):
+            workflow.visualize()
+
         # 执行工作流
         print("\n开始执行工作流...")
         results = workflow.execute()
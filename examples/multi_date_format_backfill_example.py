@@ -35,8 +35,29 @@ python multi_date_format_backfill_example.py
 import json
 import os
 from datetime import datetime
+from pathlib import Path
 from scheduler_dag.scheduler_cli import run_backfill
 
+# 配置目录在模块加载时解析一次，避免每次调用重复拼接路径
+_ROOT = Path(__file__).resolve().parents[1]
+_CONFIG_DIR = _ROOT / 'config'
+
+# orjson为可选依赖，安装后JSON解析/序列化更快；未安装时退回标准库json
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    def _json_loads(data):
+        return json.loads(data)
+
 
 def backfill_with_multi_date_formats():
     """使用多种日期格式进行回填的示例"""
@@ -64,7 +85,7 @@ def backfill_with_multi_date_formats():
     }
     
     print("\n方法1：使用代码构建的配置参数:")
-    print(json.dumps(backfill_params, indent=2))
+    print(_json_dumps(backfill_params))
     
     # 执行回填
     run_backfill(
@@ -73,13 +94,12 @@ def backfill_with_multi_date_formats():
     )
     
     # 方法2：从配置文件加载多日期参数配置
-    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                              "config", "backfill_params_example.json")
-    
+    config_path = _CONFIG_DIR / "backfill_params_example.json"
+
     print(f"\n方法2：从配置文件 {config_path} 加载参数:")
-    with open(config_path, 'r') as f:
-        file_params = json.load(f)
-        print(json.dumps(file_params, indent=2))
+    with config_path.open('r', encoding='utf-8') as f:
+        file_params = _json_loads(f.read())
+        print(_json_dumps(file_params))
     
     # 执行基于配置文件的回填
     run_backfill(
@@ -21,6 +21,7 @@
 """
 
 import os
+import shutil
 import sys
 import time
 import logging
@@ -43,9 +44,11 @@ def task1_func(**kwargs):
     ensure_dir(data_path)
     output_file = os.path.join(data_path, f"data_{day_id}.txt")
     
-    with open(output_file, 'w') as f:
-        f.write(f"示例数据生成于 {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"数据日期: {day_id}\n")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(
+            f"示例数据生成于 {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"数据日期: {day_id}\n"
+        )
         
     print(f"任务1: 数据已生成到 {output_file}")
     return {
@@ -69,15 +72,16 @@ def task2_func(**kwargs):
     output_file = os.path.join(data_path, f"processed_{day_id}.txt")
     
     # 读取输入文件
-    with open(input_file, 'r') as f:
+    with open(input_file, 'r', encoding='utf-8') as f:
         lines = f.readlines()
-        
-    # 处理数据并写入输出文件
-    with open(output_file, 'w') as f:
-        f.write(f"处理后的数据，处理时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"原始行数: {len(lines)}\n")
-        for line in lines:
-            f.write(f"处理: {line}")
+
+    # 处理数据并整体一次写出，避免逐行write各自触发一次写调用和格式化
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(
+            f"处理后的数据，处理时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"原始行数: {len(lines)}\n"
+            + "".join("处理: " + line for line in lines)
+        )
             
     print(f"任务2: 数据已处理并写入到 {output_file}")
     return {
@@ -100,24 +104,39 @@ def task3_func(**kwargs):
     day_id = kwargs.get("day_id")
     
     output_file = os.path.join(data_path, f"summary_{day_id}.txt")
-    
-    # 读取输入文件
-    with open(input_file, 'r') as f:
-        lines = f.readlines()
-        
-    # 汇总数据并写入输出文件
-    with open(output_file, 'w') as f:
-        f.write(f"数据汇总，汇总时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"数据日期: {day_id}\n")
-        f.write(f"总行数: {len(lines)}\n")
-        f.write("=" * 50 + "\n")
-        f.write("".join(lines))
-            
+
+    # 正文原样转写，不需要解码：按字节统计行数后，写完头部直接在fd之间
+    # 整块拷贝（Linux下sendfile零拷贝），避免把整个文件读成str列表再拼接
+    with open(input_file, 'rb') as fi:
+        total_rows = sum(1 for _ in fi)
+        fi.seek(0)
+
+        with open(output_file, 'wb') as fo:
+            fo.write(
+                (
+                    f"数据汇总，汇总时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"数据日期: {day_id}\n"
+                    f"总行数: {total_rows}\n"
+                    + "=" * 50 + "\n"
+                ).encode('utf-8')
+            )
+            fo.flush()
+            if hasattr(os, 'sendfile'):
+                size = os.fstat(fi.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(fo.fileno(), fi.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            else:
+                shutil.copyfileobj(fi, fo, 1024 * 1024)
+
     print(f"任务3: 数据已汇总并写入到 {output_file}")
     return {
         "input_file": input_file,
         "output_file": output_file,
-        "summary_rows": len(lines)
+        "summary_rows": total_rows
     }
 
 
@@ -199,6 +218,7 @@ def parse_args():
     parser.add_argument("--end_at", help="执行到指定任务")
     parser.add_argument("--only_tasks", help="仅执行指定任务，用逗号分隔")
     parser.add_argument("--visualize", action="store_true", help="是否可视化工作流")
+    parser.add_argument("--no-cache", action="store_true", help="禁用任务结果缓存，强制重新执行所有任务")
     return parser.parse_args()
 
 
@@ -215,7 +235,10 @@ def main():
     
     # 创建工作流
     workflow = create_workflow(args.data_path, args.day_id)
-    
+
+    # 启用结果缓存：输入未变化的任务在重复执行时直接复用上次结果
+    workflow.set_memoize(not args.no_cache)
+
     # 可视化工作流
     if args.visualize:
         try:
@@ -225,10 +248,10 @@ def main():
             print(f"可视化失败: {str(e)}")
     
     try:
-        # 解析只执行特定任务的参数
+        # 解析只执行特定任务的参数，用frozenset使后续的成员判断和集合运算为O(1)
         only_tasks = None
         if args.only_tasks:
-            only_tasks = [task.strip() for task in args.only_tasks.split(",")]
+            only_tasks = frozenset(task.strip() for task in args.only_tasks.split(",") if task.strip())
             
         # 执行工作流
         print(f"\n开始执行工作流，日期: {args.day_id}")
@@ -238,7 +261,7 @@ def main():
         if args.end_at:
             print(f"  执行到任务: {args.end_at}")
         if only_tasks:
-            print(f"  仅执行任务: {only_tasks}")
+            print(f"  仅执行任务: {', '.join(sorted(only_tasks))}")
             
         # 执行工作流
         results = workflow.execute(
@@ -265,7 +288,7 @@ def main():
             if history.get('end_at'):
                 print(f"  执行到任务: {history['end_at']}")
             if history.get('only_tasks'):
-                print(f"  仅执行任务: {history['only_tasks']}")
+                print(f"  仅执行任务: {', '.join(sorted(history['only_tasks']))}")
                 
     except Exception as e:
         print(f"工作流执行失败: {str(e)}")
@@ -41,8 +41,29 @@
 import json
 import os
 import datetime
+from pathlib import Path
 from scheduler_dag.scheduler_cli import run_backfill
 
+# 配置目录在模块加载时解析一次，避免每次调用重复拼接路径
+_ROOT = Path(__file__).resolve().parents[1]
+_CONFIG_DIR = _ROOT / 'config'
+
+# orjson为可选依赖，安装后JSON解析/序列化更快；未安装时退回标准库json
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    def _json_loads(data):
+        return json.loads(data)
+
 
 def backfill_with_different_date_formats(config_mode='json'):
     """
@@ -57,18 +78,17 @@ def backfill_with_different_date_formats(config_mode='json'):
     
     if config_mode.lower() == 'json':
         # 使用JSON配置文件
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                  'config', 'date_formats_sample.json')
-        
+        config_path = _CONFIG_DIR / 'date_formats_sample.json'
+
         print(f"使用配置文件: {config_path}")
-        
-        if not os.path.exists(config_path):
+
+        if not config_path.exists():
             print("配置文件不存在，正在创建示例配置文件...")
             create_sample_config()
             print(f"已创建示例配置文件: {config_path}")
-        
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
+
+        with config_path.open('r', encoding='utf-8') as f:
+            config = _json_loads(f.read())
             
         # 从配置文件加载参数
         start_date = config.get('start_date')
@@ -213,12 +233,11 @@ def create_sample_config():
         }
     }
     
-    config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-    os.makedirs(config_dir, exist_ok=True)
-    
-    config_path = os.path.join(config_dir, 'date_formats_sample.json')
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    _CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+
+    config_path = _CONFIG_DIR / 'date_formats_sample.json'
+    with config_path.open('w', encoding='utf-8') as f:
+        f.write(_json_dumps(config))
 
 
 def explain_date_param_config():
@@ -30,7 +30,8 @@ from .task import (
     PythonTask, 
     PySparkTask, 
     SparkSQLTask, 
-    HiveSQLTask
+    HiveSQLTask,
+    configure_logging
 )
 from .params import ParamManager
 from .utils import (
@@ -52,6 +53,7 @@ __all__ = [
     'PySparkTask', 
     'SparkSQLTask', 
     'HiveSQLTask',
+    'configure_logging',
     'ParamManager',
     'get_date',
     'parse_date_expr',
@@ -19,30 +19,104 @@
 - v1.3 (2024-07-29): 增加对未执行任务列表的告警显示
 - v1.4 (2024-08-01): 增加工作流成功的告警功能
 - v1.5 (2024-08-03): 增加回溯日期在告警中的显示
+- v1.6 (2024-08-05): 告警HTTP请求改为后台线程发送，不阻塞失败处理路径
+- v1.7 (2024-08-06): 消息体序列化支持orjson（可选依赖），Content-Type挂到Session
+- v1.8 (2024-08-06): 合并窗口内相同失败告警聚合为一张卡片，避免批量回溯刷屏
 """
 
+import atexit
 import json
+import queue
+import string
 import time
 import logging
-import traceback
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, List, Optional, Union, Set
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# orjson为可选依赖，安装后告警消息体序列化更快且直接产出bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    """将消息体序列化为UTF-8字节串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
 logger = logging.getLogger("alert")
 
+# 告警中时间戳的展示格式
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 class AlertManager:
     """告警管理器，负责发送各种告警"""
-    
+
+    # 告警正文模板在类加载时解析一次，发送时只做一次substitute替换；
+    # 可选片段（回溯日期、未执行任务）预先格式化后以整行为单位填入
+    _FAIL_TPL = string.Template("""
+**工作流名称**: ${workflow_name}
+**开始时间**: ${start_time_str}
+**执行时长**: ${duration}秒
+${backfill_line}
+**失败信息**
+- **失败任务**: ${failed_task_id}
+- **失败原因**: ${failed_reason}
+
+**执行情况**
+- **已完成任务**: ${completed}
+${uncompleted_line}""")
+
+    _SUCCESS_TPL = string.Template("""
+**工作流名称**: ${workflow_name}
+**开始时间**: ${start_time_str}
+**执行时长**: ${duration}秒
+${backfill_line}
+**执行状态**: 成功
+
+**执行情况**
+- **已完成任务**: ${completed}
+""")
+
     def __init__(self):
         """初始化告警管理器"""
         self.enabled = False
         self.webhook_url = None
         self.alert_config = {}
+        self._alert_queue = None  # 告警发送队列，首次发送时惰性创建
+        self._worker = None  # 后台发送线程
+        # 失败告警合并：合并窗口内相同(工作流, 任务, 原因)的失败只发一张卡片，
+        # 避免批量回溯时重复刷屏并触发飞书限流
+        self.coalesce_window = 5.0
+        self._pending = {}  # {(workflow_name, failed_task_id, failed_reason): 合并记录}
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        # 复用同一Session发送告警：保持到飞书网关的连接（免去每次DNS解析和
+        # TLS握手），并对临时性错误自动重试
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Content-Type固定，挂在Session上一次设置，发送时不再逐请求构造headers
+        self._session.headers["Content-Type"] = "application/json"
+        atexit.register(self._session.close)
+        # 进程退出前兜底发送：先注册close再注册flush（atexit按LIFO执行，
+        # flush先于close运行），合并窗口内未到期的告警在退出时聚合发出
+        atexit.register(self.flush, 15)
         
     def enable_feishu_alert(self, webhook_url: str, **kwargs) -> None:
         """
@@ -52,6 +126,13 @@ class AlertManager:
             webhook_url: 飞书机器人webhook地址
             **kwargs: 其他配置项
         """
+        # 仅在调用方未配置任何日志handler时兜底配置，import本模块不再覆盖
+        # 下游的日志设置
+        if not logging.getLogger().handlers:
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
         self.enabled = True
         self.webhook_url = webhook_url
         self.alert_config.update(kwargs)
@@ -92,41 +173,53 @@ class AlertManager:
             return {"status": "disabled", "message": "告警未启用或未配置webhook URL"}
             
         # 格式化开始时间
-        start_time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start_time))
+        start_time_str = time.strftime(TIME_FORMAT, time.localtime(start_time))
         
         # 准备飞书消息
         title = f"⚠️ 工作流失败告警: {workflow_name}"
         if backfill_date:
             title += f" (回溯日期: {backfill_date})"
-        
-        # 构建markdown消息内容
-        # 注意：飞书Markdown格式要求，需要使用**粗体**来表示标题
-        markdown_content = f"""
-**工作流名称**: {workflow_name}
-**开始时间**: {start_time_str}
-**执行时长**: {time.time() - start_time:.2f}秒
-"""
-
-        # 添加回溯信息
-        if backfill_date:
-            markdown_content += f"**回溯日期**: {backfill_date}\n"
-
-        markdown_content += f"""
-**失败信息**
-- **失败任务**: {failed_task_id}
-- **失败原因**: {failed_reason}
 
-**执行情况**
-- **已完成任务**: {', '.join(completed_tasks) if completed_tasks else '无'}
-"""
-
-        # 添加未执行任务列表信息
+        # 预格式化可选片段，再做一次模板替换得到完整markdown正文
+        # 注意：飞书Markdown格式要求，需要使用**粗体**来表示标题
+        backfill_line = f"**回溯日期**: {backfill_date}\n" if backfill_date else ""
         if uncompleted_tasks and len(uncompleted_tasks) > 0:
-            markdown_content += f"- **未执行任务**: {', '.join(uncompleted_tasks)}\n  原因: 由于上游任务失败，这些任务未被执行"
+            uncompleted_line = f"- **未执行任务**: {', '.join(uncompleted_tasks)}\n  原因: 由于上游任务失败，这些任务未被执行"
         else:
-            markdown_content += "- **未执行任务**: 无"
-        
-        return self._send_feishu_alert(title, markdown_content)
+            uncompleted_line = "- **未执行任务**: 无"
+
+        markdown_content = self._FAIL_TPL.substitute(
+            workflow_name=workflow_name,
+            start_time_str=start_time_str,
+            duration=f"{time.time() - start_time:.2f}",
+            backfill_line=backfill_line,
+            failed_task_id=failed_task_id,
+            failed_reason=failed_reason,
+            completed=', '.join(completed_tasks) if completed_tasks else '无',
+            uncompleted_line=uncompleted_line
+        )
+
+        # 相同失败在合并窗口内只发一张卡片：批量回溯在同一个任务上连续失败时，
+        # 聚合为一条"发生N次"的告警，而不是每个日期点各发一条
+        key = (workflow_name, failed_task_id, failed_reason)
+        with self._pending_lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = {
+                    "title": title,
+                    "content": markdown_content,
+                    "count": 1,
+                    "dates": [backfill_date] if backfill_date else []
+                }
+            else:
+                entry["count"] += 1
+                if backfill_date:
+                    entry["dates"].append(backfill_date)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.coalesce_window, self._flush_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return {"status": "queued", "message": "告警已合并等待发送"}
     
     def send_workflow_success_alert(
         self, 
@@ -152,30 +245,22 @@ class AlertManager:
             return {"status": "disabled", "message": "告警未启用或未配置webhook URL"}
             
         # 格式化开始时间
-        start_time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start_time))
+        start_time_str = time.strftime(TIME_FORMAT, time.localtime(start_time))
         
         # 准备飞书消息
         title = f"✅ 工作流执行成功: {workflow_name}"
         if backfill_date:
             title += f" (回溯日期: {backfill_date})"
-        
-        # 构建markdown消息内容
-        markdown_content = f"""
-**工作流名称**: {workflow_name}
-**开始时间**: {start_time_str}
-**执行时长**: {time.time() - start_time:.2f}秒
-"""
 
-        # 添加回溯信息
-        if backfill_date:
-            markdown_content += f"**回溯日期**: {backfill_date}\n"
-
-        markdown_content += f"""
-**执行状态**: 成功
-
-**执行情况**
-- **已完成任务**: {', '.join(completed_tasks) if completed_tasks else '无'}
-"""
+        # 预格式化可选片段，再做一次模板替换得到完整markdown正文
+        backfill_line = f"**回溯日期**: {backfill_date}\n" if backfill_date else ""
+        markdown_content = self._SUCCESS_TPL.substitute(
+            workflow_name=workflow_name,
+            start_time_str=start_time_str,
+            duration=f"{time.time() - start_time:.2f}",
+            backfill_line=backfill_line,
+            completed=', '.join(completed_tasks) if completed_tasks else '无'
+        )
         
         return self._send_feishu_alert(title, markdown_content, "green")
     
@@ -191,60 +276,136 @@ class AlertManager:
         Returns:
             告警发送结果
         """
-        try:
-            # 飞书消息格式
-            message = {
-                "msg_type": "interactive",
-                "card": {
-                    "config": {
-                        "wide_screen_mode": True
-                    },
-                    "header": {
-                        "title": {
-                            "tag": "plain_text",
-                            "content": title
-                        },
-                        "template": template
+        # 飞书消息格式
+        message = {
+            "msg_type": "interactive",
+            "card": {
+                "config": {
+                    "wide_screen_mode": True
+                },
+                "header": {
+                    "title": {
+                        "tag": "plain_text",
+                        "content": title
                     },
-                    "elements": [
-                        {
-                            "tag": "markdown",
-                            "content": content
-                        }
-                    ]
-                }
-            }
-            
-            # 额外添加at功能
-            if self.alert_config.get("at_all"):
-                message["card"]["elements"].append({
-                    "tag": "div",
-                    "text": {
-                        "tag": "lark_md",
-                        "content": "<at id=all></at>"
+                    "template": template
+                },
+                "elements": [
+                    {
+                        "tag": "markdown",
+                        "content": content
                     }
-                })
-                
-            # 发送请求
-            response = requests.post(
-                self.webhook_url, 
-                json=message,
-                headers={"Content-Type": "application/json"},
-                timeout=10
+                ]
+            }
+        }
+
+        # 额外添加at功能
+        if self.alert_config.get("at_all"):
+            message["card"]["elements"].append({
+                "tag": "div",
+                "text": {
+                    "tag": "lark_md",
+                    "content": "<at id=all></at>"
+                }
+            })
+
+        # HTTP请求交给常驻后台线程发送：发送窗口与调用方的收尾阶段（记录历史、
+        # 打印摘要）重叠，失败路径不再被网络延迟阻塞，且多条告警复用同一线程
+        # 并按入队顺序发送。调用方可通过flush()等待发送完成
+        self._ensure_worker()
+        self._alert_queue.put((title, message))
+        return {"status": "queued", "message": "告警已在后台发送"}
+
+    def _ensure_worker(self) -> None:
+        """惰性创建告警发送队列和后台线程"""
+        if self._alert_queue is None:
+            self._alert_queue = queue.Queue()
+            self._worker = threading.Thread(
+                target=self._drain,
+                name="feishu-alert",
+                daemon=True
             )
-            
+            self._worker.start()
+
+    def _drain(self) -> None:
+        """后台线程主循环，依次发送队列中的告警"""
+        while True:
+            title, message = self._alert_queue.get()
+            try:
+                self._post_feishu_message(title, message)
+            except Exception:
+                # 兜底保护发送线程：意外异常记录后继续处理后续告警
+                logger.exception(f"发送飞书告警出现未预期异常: {title}")
+            finally:
+                self._alert_queue.task_done()
+
+    def _flush_pending(self) -> None:
+        """将合并窗口内积累的失败告警各自聚合为一张卡片入队发送"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+        for entry in pending.values():
+            title = entry["title"]
+            content = entry["content"]
+            if entry["count"] > 1:
+                # 聚合重复失败：首条卡片正文 + 合并摘要
+                summary = f"\n**告警合并**: 相同失败共发生{entry['count']}次"
+                if entry["dates"]:
+                    summary += f"，回溯日期: {', '.join(entry['dates'])}"
+                    title = f"{entry['title'].split(' (回溯日期')[0]} (合并{entry['count']}个日期点)"
+                content += summary
+            self._send_feishu_alert(title, content)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        立即聚合合并窗口中的失败告警并等待队列全部发送完成
+
+        后台线程为daemon线程，本方法已注册为atexit钩子，进程退出前
+        自动执行确保告警不丢失；常驻进程也可显式调用强制送出。
+        注意：会提前结束合并窗口，常规路径应交给定时器自然触发。
+
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+        """
+        # 先把合并窗口中尚未到期的失败告警立即聚合入队，再等待队列清空
+        self._flush_pending()
+        if self._alert_queue is None:
+            return
+        if timeout is None:
+            self._alert_queue.join()
+            return
+        deadline = time.time() + timeout
+        while self._alert_queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+    def _post_feishu_message(self, title: str, message: Dict[str, Any]) -> None:
+        """
+        实际发送飞书消息的后台线程体
+
+        Args:
+            title: 告警标题，用于日志
+            message: 完整的飞书消息体
+        """
+        try:
+            # 自行序列化为bytes传data=，跳过requests内部json.dumps加str编码的路径
+            response = self._session.post(
+                self.webhook_url,
+                data=_dumps_bytes(message),
+                timeout=(3.05, 10)  # (连接超时, 读取超时)
+            )
+
             if response.status_code == 200:
                 logger.info(f"成功发送飞书告警: {title}")
-                return {"status": "success", "response": response.json()}
             else:
                 logger.error(f"发送飞书告警失败: {response.status_code} - {response.text}")
-                return {"status": "failed", "code": response.status_code, "message": response.text}
-                
-        except Exception as e:
-            error_msg = f"发送飞书告警异常: {str(e)}"
-            logger.error(error_msg)
-            logger.error(traceback.format_exc())
-            return {"status": "error", "message": error_msg}
+
+        except (requests.RequestException, ValueError) as e:
+            # logger.exception在日志真正输出时才格式化堆栈，比主动调用
+            # traceback.format_exc()便宜，webhook持续不可用时不反复走栈
+            logger.exception(f"发送飞书告警异常: {str(e)}")
 
 
 # 全局告警管理器实例
@@ -24,9 +24,12 @@ workflow = config.create_workflow()
 """
 
 import os
+import copy
 import json
 import logging
-from typing import Dict, List, Any, Optional, Union
+import functools
+from collections import ChainMap
+from typing import Dict, List, Any, Optional, Union, Callable
 
 from .dag import Workflow
 from .task import (
@@ -36,6 +39,45 @@ from .task import (
 
 logger = logging.getLogger(__name__)
 
+# orjson为可选依赖，安装后大配置文件的解析明显更快；未安装时退回标准库json
+try:
+    import orjson
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError, orjson.JSONDecodeError)
+except ImportError:
+    orjson = None
+    _JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(json_file: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    按(文件绝对路径, 修改时间)缓存配置文件的JSON解析结果
+
+    同一配置文件被重复加载时（如示例脚本或回溯多次创建工作流），
+    直接复用缓存的解析结果，避免重复的磁盘读取和JSON解析；
+    文件被修改后mtime变化，缓存自动失效。
+
+    返回的是缓存内部的字典，调用方必须先拷贝再使用，
+    不能直接改写（见from_json的deepcopy）。
+
+    Args:
+        json_file: 配置文件绝对路径
+        mtime_ns: 文件修改时间（纳秒），仅用作缓存键
+
+    Returns:
+        JSON解析后的配置字典
+    """
+    if orjson is not None:
+        with open(json_file, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def clear_config_cache() -> None:
+    """清空配置文件解析缓存，长驻进程在需要强制重新读盘时调用"""
+    _load_config_cached.cache_clear()
+
 
 class WorkflowConfig:
     """工作流配置类，用于解析和加载工作流配置"""
@@ -82,9 +124,14 @@ class WorkflowConfig:
             raise FileNotFoundError(f"配置文件不存在: {json_file}")
             
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                
+            abs_path = os.path.abspath(json_file)
+            # 缓存命中返回的是共享字典，深拷贝一份交给调用方：下游会原地
+            # 改写配置（如SparkSQLTask往spark_config里塞变量替换开关），
+            # 不拷贝会污染缓存，影响之后对同一文件的加载
+            config_data = copy.deepcopy(
+                _load_config_cached(abs_path, os.stat(abs_path).st_mtime_ns)
+            )
+
             # 验证基本字段
             if 'name' not in config_data:
                 raise ValueError("配置文件缺少必要字段: name")
@@ -97,7 +144,7 @@ class WorkflowConfig:
                 dependencies=config_data.get('dependencies', []),
                 alert=config_data.get('alert', {})
             )
-        except json.JSONDecodeError as e:
+        except _JSON_DECODE_ERRORS as e:
             raise ValueError(f"JSON格式错误: {str(e)}")
         except Exception as e:
             raise ValueError(f"加载配置文件失败: {str(e)}")
@@ -118,12 +165,9 @@ class WorkflowConfig:
             description=self.description
         )
         
-        # 设置参数
-        params = dict(self.params)
-        if override_params:
-            params.update(override_params)
-        
-        workflow.set_params(params)
+        # 设置参数：覆盖参数优先于配置参数，ChainMap按此顺序提供
+        # 相同的读取语义，免去每次创建工作流都复制一遍参数字典
+        workflow.set_params(ChainMap(override_params or {}, self.params))
         
         # 创建任务
         for task_config in self.tasks:
@@ -183,65 +227,89 @@ class WorkflowConfig:
             raise ValueError(f"任务 {task_id} 配置缺少必要字段: type")
             
         params = task_config.get('params', {})
-        
-        # 根据任务类型创建相应的任务对象
-        if task_type == 'shell':
-            command = task_config.get('command')
-            if not command:
-                raise ValueError(f"Shell任务 {task_id} 配置缺少必要字段: command")
-                
-            return ShellTask(
-                task_id=task_id,
-                command=command,
-                params=params,
-                working_dir=task_config.get('working_dir')
-            )
-            
-        elif task_type == 'python':
-            return PythonTask(
-                task_id=task_id,
-                script_path=task_config.get('script_path'),
-                script_content=task_config.get('script_content'),
-                params=params,
-                custom_command=task_config.get('custom_command'),
-                working_dir=task_config.get('working_dir')
-            )
-            
-        elif task_type == 'pyspark':
-            return PySparkTask(
-                task_id=task_id,
-                script_path=task_config.get('script_path'),
-                script_content=task_config.get('script_content'),
-                params=params,
-                spark_config=task_config.get('spark_config', {}),
-                working_dir=task_config.get('working_dir')
-            )
-            
-        elif task_type == 'spark-sql':
-            return SparkSQLTask(
-                task_id=task_id,
-                sql=task_config.get('sql'),
-                sql_file=task_config.get('sql_file'),
-                params=params,
-                spark_config=task_config.get('spark_config', {}),
-                working_dir=task_config.get('working_dir'),
-                init_script=task_config.get('init_script')
-            )
-            
-        elif task_type == 'hive-sql':
-            return HiveSQLTask(
-                task_id=task_id,
-                sql=task_config.get('sql'),
-                sql_file=task_config.get('sql_file'),
-                params=params,
-                hive_config=task_config.get('hive_config', {}),
-                working_dir=task_config.get('working_dir'),
-                init_script=task_config.get('init_script')
-            )
-            
-        else:
+
+        # 按任务类型O(1)分发到对应的构建函数，避免每个任务走一遍elif链
+        builder = self._TASK_BUILDERS.get(task_type)
+        if builder is None:
             raise ValueError(f"不支持的任务类型: {task_type}")
-            
+        return builder(task_id, task_config, params)
+
+    @staticmethod
+    def _build_shell_task(task_id: str, task_config: Dict[str, Any], params: Dict[str, Any]) -> Task:
+        """构建Shell任务"""
+        command = task_config.get('command')
+        if not command:
+            raise ValueError(f"Shell任务 {task_id} 配置缺少必要字段: command")
+
+        return ShellTask(
+            task_id=task_id,
+            command=command,
+            params=params,
+            working_dir=task_config.get('working_dir')
+        )
+
+    @staticmethod
+    def _build_python_task(task_id: str, task_config: Dict[str, Any], params: Dict[str, Any]) -> Task:
+        """构建Python任务"""
+        return PythonTask(
+            task_id=task_id,
+            script_path=task_config.get('script_path'),
+            script_content=task_config.get('script_content'),
+            params=params,
+            custom_command=task_config.get('custom_command'),
+            working_dir=task_config.get('working_dir')
+        )
+
+    @staticmethod
+    def _build_pyspark_task(task_id: str, task_config: Dict[str, Any], params: Dict[str, Any]) -> Task:
+        """构建PySpark任务"""
+        return PySparkTask(
+            task_id=task_id,
+            script_path=task_config.get('script_path'),
+            script_content=task_config.get('script_content'),
+            params=params,
+            spark_config=task_config.get('spark_config', {}),
+            working_dir=task_config.get('working_dir')
+        )
+
+    @staticmethod
+    def _build_spark_sql_task(task_id: str, task_config: Dict[str, Any], params: Dict[str, Any]) -> Task:
+        """构建SparkSQL任务"""
+        return SparkSQLTask(
+            task_id=task_id,
+            sql=task_config.get('sql'),
+            sql_file=task_config.get('sql_file'),
+            params=params,
+            spark_config=task_config.get('spark_config', {}),
+            working_dir=task_config.get('working_dir'),
+            init_script=task_config.get('init_script')
+        )
+
+    @staticmethod
+    def _build_hive_sql_task(task_id: str, task_config: Dict[str, Any], params: Dict[str, Any]) -> Task:
+        """构建HiveSQL任务"""
+        return HiveSQLTask(
+            task_id=task_id,
+            sql=task_config.get('sql'),
+            sql_file=task_config.get('sql_file'),
+            params=params,
+            hive_config=task_config.get('hive_config', {}),
+            working_dir=task_config.get('working_dir'),
+            init_script=task_config.get('init_script')
+        )
+
+    # 任务类型到构建函数的分发表，新增任务类型时在此注册即可。
+    # 类体内取到的是staticmethod描述符，3.10之前staticmethod对象
+    # 不可直接调用，存底层函数__func__保证各版本行为一致
+    _TASK_BUILDERS: Dict[str, Callable[..., Task]] = {
+        'shell': _build_shell_task.__func__,
+        'python': _build_python_task.__func__,
+        'pyspark': _build_pyspark_task.__func__,
+        'spark-sql': _build_spark_sql_task.__func__,
+        'hive-sql': _build_hive_sql_task.__func__,
+    }
+
+
     def get_task_ids(self) -> List[str]:
         """
         获取所有任务ID
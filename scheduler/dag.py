@@ -16,25 +16,50 @@
 - v1.0 (2024-07-11): 初始版本
 - v1.1 (2024-08-01): 添加任务重试功能支持和工作流成功告警
 - v1.2 (2024-08-03): 添加回溯日期显示在告警中
+- v1.3 (2024-08-05): 工作流执行改为增量Kahn算法调度，支持独立任务并行执行
+- v1.4 (2024-08-06): 工作流支持Python任务结果缓存，输入未变化时跳过重复执行
 """
 
+import array
 import copy
+import hashlib
+import json
 import logging
+import os
+import pickle
+import queue
 import time
 from collections import defaultdict, deque
-from typing import Dict, List, Set, Any, Optional, Union, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Any, Mapping, Optional, Union, Callable, Collection, Sequence
 
 from .task import Task
 from .params import ParamManager
 from .alert import alert_manager
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 日志配置交由使用方决定，库模块不在导入时调用basicConfig改写全局配置
 logger = logging.getLogger("dag")
 
 
+def _snapshot_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    生成参数字典的快照用于记录执行历史
+
+    纯数据字典走JSON往返复制，比deepcopy的通用对象图遍历快得多；
+    参数中含不可JSON序列化的值时回退到deepcopy，保证行为不变。
+
+    Args:
+        params: 参数字典
+
+    Returns:
+        与原字典内容相同的独立副本
+    """
+    try:
+        return json.loads(json.dumps(params))
+    except (TypeError, ValueError):
+        return copy.deepcopy(params)
+
+
 class DAG:
     """DAG引擎，管理任务依赖关系及执行顺序"""
     
@@ -52,22 +77,53 @@ class DAG:
         self.dependencies: Dict[str, Set[str]] = defaultdict(set)  # 存储任务依赖，键为任务ID，值为其依赖的任务集合
         self.reverse_dependencies: Dict[str, Set[str]] = defaultdict(set)  # 反向依赖，键为任务ID，值为依赖于它的任务集合
         self.param_manager = ParamManager()  # 参数管理器
-        
+        self._topo_cache: Optional[tuple] = None  # 拓扑排序结果缓存（元组结构不可变），结构变化时失效
+        self._visualize_cache: Optional[tuple] = None  # 上次渲染的(拓扑指纹, 文件名)，用于跳过重复渲染
+        self._downstream_closure: Optional[Dict[str, frozenset]] = None  # 下游传递闭包缓存
+        self._upstream_closure: Optional[Dict[str, frozenset]] = None  # 上游传递闭包缓存
+        self._task_id_set: Optional[frozenset] = None  # 全部任务ID的frozenset缓存
+        self._dep_tuples: Optional[Dict[str, tuple]] = None  # 任务ID到上游元组的缓存
+        self._rev_dep_tuples: Optional[Dict[str, tuple]] = None  # 任务ID到下游元组的缓存
+        self._frozen = False  # 首次拓扑排序通过环路校验后置True，结构变更时重置
+
+    def _invalidate_structure_caches(self) -> None:
+        """
+        图结构变更后统一失效所有派生缓存
+
+        add_task/set_dependency修改图结构时调用，保证缓存失效项
+        只在一处维护；同时解除冻结状态，下次排序重新做环路校验。
+        """
+        self._frozen = False
+        self._topo_cache = None
+        self._downstream_closure = None
+        self._upstream_closure = None
+        self._task_id_set = None
+        self._dep_tuples = None
+        self._rev_dep_tuples = None
+
     def add_task(self, task: Task) -> 'DAG':
         """
         添加任务到DAG
-        
+
         Args:
             task: 任务对象
-            
+
         Returns:
             当前DAG对象，用于链式调用
         """
         if task.task_id in self.tasks:
             logger.warning(f"任务 {task.task_id} 已存在，将被覆盖")
-        
+
         self.tasks[task.task_id] = task
+        self._invalidate_structure_caches()
         return self
+
+    @property
+    def task_id_set(self) -> frozenset:
+        """全部任务ID的frozenset，惰性构建并随add_task失效"""
+        if self._task_id_set is None:
+            self._task_id_set = frozenset(self.tasks)
+        return self._task_id_set
     
     def set_dependency(self, upstream_task_id: str, downstream_task_id: str) -> 'DAG':
         """
@@ -89,9 +145,42 @@ class DAG:
         self.dependencies[downstream_task_id].add(upstream_task_id)
         # 添加反向依赖关系
         self.reverse_dependencies[upstream_task_id].add(downstream_task_id)
-        
+        self._invalidate_structure_caches()
+
         return self
-    
+
+    def _get_dep_tuples(self) -> Dict[str, tuple]:
+        """
+        获取任务ID到直接上游元组的映射
+
+        在执行热循环中按元组遍历上游比每次对defaultdict做.get(set())
+        更省：无临时集合分配，迭代走元组的C路径。缓存随依赖变化失效。
+
+        Returns:
+            任务ID到上游任务ID元组的字典
+        """
+        if self._dep_tuples is None:
+            self._dep_tuples = {
+                task_id: tuple(deps) for task_id, deps in self.dependencies.items()
+            }
+        return self._dep_tuples
+
+    def _get_rev_dep_tuples(self) -> Dict[str, tuple]:
+        """
+        获取任务ID到直接下游元组的映射
+
+        与_get_dep_tuples对应的反向索引，供调度热循环递减下游入度时
+        使用，避免每次对defaultdict做.get(set())的临时集合分配。
+
+        Returns:
+            任务ID到下游任务ID元组的字典
+        """
+        if self._rev_dep_tuples is None:
+            self._rev_dep_tuples = {
+                task_id: tuple(deps) for task_id, deps in self.reverse_dependencies.items()
+            }
+        return self._rev_dep_tuples
+
     def set_upstream(self, task_id: str, upstream_task_id: str) -> 'DAG':
         """
         设置上游任务
@@ -139,36 +228,60 @@ class DAG:
         Returns:
             任务ID的列表的列表，每个子列表为一个可并行执行的任务组
         """
-        # 计算每个任务的入度（依赖任务数量）
-        in_degree = {task_id: len(deps) for task_id, deps in self.dependencies.items()}
-        # 为未出现在dependencies中的任务设置入度为0
-        for task_id in self.tasks:
-            if task_id not in in_degree:
-                in_degree[task_id] = 0
-        
+        # 任务和依赖关系未变化时直接复用缓存结果，
+        # 避免execute/visualize/info等入口重复排序
+        if self._topo_cache is not None:
+            return [list(level) for level in self._topo_cache]
+
+        # 将任务连续编号，后继邻接以CSR布局存放在两个连续的int数组中，
+        # 排序主循环只做数组下标访问，避免在字典和集合对象间跳转
+        task_ids = list(self.tasks)
+        id_to_idx = {task_id: idx for idx, task_id in enumerate(task_ids)}
+        task_count = len(task_ids)
+
+        # 每个任务的入度（依赖任务数量）
+        in_degree = array.array('i', (
+            len(self.dependencies.get(task_id, ())) for task_id in task_ids
+        ))
+
+        # CSR邻接：indices存放所有后继的编号，indptr[i]:indptr[i+1]为任务i的后继区间
+        indptr = array.array('i', [0]) * (task_count + 1)
+        indices = array.array('i')
+        for idx, task_id in enumerate(task_ids):
+            for downstream_id in self.reverse_dependencies.get(task_id, ()):
+                indices.append(id_to_idx[downstream_id])
+            indptr[idx + 1] = len(indices)
+
         # 初始化结果列表和队列
         result = []
-        queue = deque([task_id for task_id, degree in in_degree.items() if degree == 0])
-        
+        processed = 0
+        queue = deque(idx for idx in range(task_count) if in_degree[idx] == 0)
+
         while queue:
             # 当前层级的任务
             current_level = list(queue)
             queue.clear()
-            result.append(current_level)
-            
+            result.append([task_ids[idx] for idx in current_level])
+            processed += len(current_level)
+
             # 处理当前层级的每个任务
-            for task_id in current_level:
+            for idx in current_level:
                 # 减少依赖于当前任务的任务的入度
-                for downstream_id in self.reverse_dependencies[task_id]:
-                    in_degree[downstream_id] -= 1
+                for pos in range(indptr[idx], indptr[idx + 1]):
+                    downstream_idx = indices[pos]
+                    in_degree[downstream_idx] -= 1
                     # 如果入度变为0，加入队列
-                    if in_degree[downstream_id] == 0:
-                        queue.append(downstream_id)
-        
+                    if in_degree[downstream_idx] == 0:
+                        queue.append(downstream_idx)
+
         # 检查是否存在环
-        if sum(len(level) for level in result) != len(self.tasks):
+        if processed != task_count:
             raise ValueError("DAG中存在环路，无法执行拓扑排序")
-            
+
+        # 缓存为不可变的元组结构，杜绝调用方篡改缓存的可能；
+        # 冻结标记表示当前结构已通过环路校验，结构再次变更前不必重复校验
+        self._topo_cache = tuple(tuple(level) for level in result)
+        self._frozen = True
         return result
     
     def get_dependencies(self) -> Dict[str, Set[str]]:
@@ -185,7 +298,7 @@ class DAG:
                 dependencies[upstream_id] = set(downstream_ids)
         return dependencies
     
-    def set_params(self, params: Dict[str, Any]) -> 'DAG':
+    def set_params(self, params: Mapping[str, Any]) -> 'DAG':
         """
         设置DAG级别的全局参数
         
@@ -213,129 +326,166 @@ class DAG:
         """
         # 获取拓扑排序后的任务组
         task_levels = self.topological_sort()
-        
+
         # 确定要执行的任务
-        tasks_to_execute = set()
-        if only_tasks:
-            # 如果只执行特定任务，验证这些任务存在
-            for task_id in only_tasks:
-                if task_id not in self.tasks:
-                    raise ValueError(f"任务 {task_id} 不存在")
-                tasks_to_execute.add(task_id)
-        else:
-            # 如果没有指定特定任务，则执行全部任务
-            # 但可能根据start_from和end_at进行筛选
-            tasks_to_execute = set(self.tasks.keys())
-        
-        # 如果指定了start_from，过滤出该任务及其所有下游任务
-        if start_from:
-            if start_from not in self.tasks:
-                raise ValueError(f"开始任务 {start_from} 不存在")
-                
-            # 从start_from开始的所有下游任务
-            downstream_tasks = self._get_downstream_tasks(start_from)
-            # 添加start_from本身
-            downstream_tasks.add(start_from)
-            
-            # 更新要执行的任务集合
-            tasks_to_execute &= downstream_tasks
-        
-        # 如果指定了end_at，过滤出该任务及其所有上游任务
-        if end_at:
-            if end_at not in self.tasks:
-                raise ValueError(f"结束任务 {end_at} 不存在")
-                
-            # 获取end_at及其所有上游任务
-            upstream_tasks = self._get_upstream_tasks(end_at)
-            # 添加end_at本身
-            upstream_tasks.add(end_at)
-            
-            # 更新要执行的任务集合
-            tasks_to_execute &= upstream_tasks
-        
-        # 执行筛选后的任务
-        results = {}
+        tasks_to_execute = self._plan(start_from, end_at, only_tasks)
+
+        # 提前裁剪掉筛选后为空的级别，深层DAG执行窄子集时
+        # 主循环不再逐级做空层判断
+        filtered_levels = []
         for level in task_levels:
             level_tasks = [task_id for task_id in level if task_id in tasks_to_execute]
-            
-            if not level_tasks:
-                continue
-                
-            logger.info(f"执行任务级别: {level_tasks}")
+            if level_tasks:
+                filtered_levels.append(level_tasks)
+        logger.info("共 %d 个任务级别待执行", len(filtered_levels))
+
+        # 执行筛选后的任务
+        results = {}
+        dep_tuples = self._get_dep_tuples()  # 冻结的上游索引，循环内零分配取用
+        for level_tasks in filtered_levels:
+            logger.info("执行任务级别: %s", level_tasks)
             
             # 这里可以实现并行执行逻辑，目前是顺序执行
             for task_id in level_tasks:
                 task = self.tasks[task_id]
                 # 获取所有上游任务结果传递给当前任务
-                upstream_results = {up_id: results[up_id] for up_id in self.dependencies.get(task_id, set()) if up_id in results}
+                upstream_results = {up_id: results[up_id] for up_id in dep_tuples.get(task_id, ()) if up_id in results}
                 
                 # 替换任务中的参数
                 task.resolve_params(self.param_manager)
                 
                 # 执行任务（使用重试机制）
-                logger.info(f"开始执行任务: {task_id}")
+                logger.info("开始执行任务: %s", task_id)
                 start_time = time.time()
                 try:
                     task_result = task.execute_with_retry(upstream_results)
                     results[task_id] = task_result
                     duration = time.time() - start_time
-                    logger.info(f"任务 {task_id} 执行成功，耗时 {duration:.2f} 秒")
+                    logger.info("任务 %s 执行成功，耗时 %.2f 秒", task_id, duration)
                 except Exception as e:
                     duration = time.time() - start_time
-                    logger.error(f"任务 {task_id} 执行失败，耗时 {duration:.2f} 秒: {str(e)}")
+                    logger.error("任务 %s 执行失败，耗时 %.2f 秒: %s", task_id, duration, str(e))
                     raise
                 
         return results
-    
+
+    def _plan(self, start_from: Optional[str] = None, end_at: Optional[str] = None,
+              only_tasks: Optional[Collection[str]] = None) -> Set[str]:
+        """
+        根据筛选条件确定本次要执行的任务集合
+
+        校验与筛选逻辑由DAG.execute和Workflow.execute共用，
+        避免两处各自维护一份相同的实现。
+
+        Args:
+            start_from: 开始执行的任务ID，如果提供，则筛选该任务及其所有下游任务
+            end_at: 结束执行的任务ID，如果提供，则筛选该任务及其所有上游任务
+            only_tasks: 只执行指定的任务集合
+
+        Returns:
+            要执行的任务ID集合
+
+        Raises:
+            ValueError: 筛选条件中引用的任务不存在
+        """
+        # 确定要执行的任务
+        tasks_to_execute = set()
+        if only_tasks:
+            # 如果只执行特定任务，验证这些任务存在
+            for task_id in only_tasks:
+                if task_id not in self.tasks:
+                    raise ValueError(f"任务 {task_id} 不存在")
+                tasks_to_execute.add(task_id)
+        else:
+            # 如果没有指定特定任务，则执行全部任务
+            # 但可能根据start_from和end_at进行筛选（复用缓存的ID集合）
+            tasks_to_execute = set(self.task_id_set)
+
+        # 直接与缓存的闭包frozenset求交，不再为"闭包+自身"拷贝临时集合
+        if start_from or end_at:
+            if self._downstream_closure is None:
+                self._build_closures()
+
+        # 如果指定了start_from，过滤出该任务及其所有下游任务
+        if start_from:
+            if start_from not in self.tasks:
+                raise ValueError(f"开始任务 {start_from} 不存在")
+
+            keep_self = start_from in tasks_to_execute
+            tasks_to_execute &= self._downstream_closure.get(start_from, frozenset())
+            # start_from本身也属于筛选结果（前提是它在待选集合内）
+            if keep_self:
+                tasks_to_execute.add(start_from)
+
+        # 如果指定了end_at，过滤出该任务及其所有上游任务
+        if end_at:
+            if end_at not in self.tasks:
+                raise ValueError(f"结束任务 {end_at} 不存在")
+
+            keep_self = end_at in tasks_to_execute
+            tasks_to_execute &= self._upstream_closure.get(end_at, frozenset())
+            # end_at本身也属于筛选结果（前提是它在待选集合内）
+            if keep_self:
+                tasks_to_execute.add(end_at)
+
+        return tasks_to_execute
+
+    def _build_closures(self) -> None:
+        """
+        一次性计算所有任务的上下游传递闭包并缓存
+
+        沿拓扑序（及其逆序）做动态规划：每个任务的闭包等于直接邻居的
+        闭包并集加上邻居本身，整图一趟算完。缓存随图结构变化失效，
+        之后start_from/end_at的子图筛选只剩O(1)的字典取值。
+        """
+        order = [task_id for level in self.topological_sort() for task_id in level]
+
+        downstream_closure = {}
+        for task_id in reversed(order):
+            children = self.reverse_dependencies.get(task_id, set())
+            closure = set(children)
+            for child in children:
+                closure |= downstream_closure[child]
+            downstream_closure[task_id] = frozenset(closure)
+
+        upstream_closure = {}
+        for task_id in order:
+            parents = self.dependencies.get(task_id, set())
+            closure = set(parents)
+            for parent in parents:
+                closure |= upstream_closure[parent]
+            upstream_closure[task_id] = frozenset(closure)
+
+        self._downstream_closure = downstream_closure
+        self._upstream_closure = upstream_closure
+
     def _get_downstream_tasks(self, task_id: str) -> Set[str]:
         """
         获取任务的所有下游任务（包括间接下游）
-        
+
         Args:
             task_id: 任务ID
-            
+
         Returns:
             下游任务ID集合
         """
-        result = set()
-        queue = deque([task_id])
-        visited = set()
-        
-        while queue:
-            current = queue.popleft()
-            visited.add(current)
-            
-            for downstream in self.reverse_dependencies.get(current, set()):
-                result.add(downstream)
-                if downstream not in visited:
-                    queue.append(downstream)
-                    
-        return result
-    
+        if self._downstream_closure is None:
+            self._build_closures()
+        return set(self._downstream_closure.get(task_id, ()))
+
     def _get_upstream_tasks(self, task_id: str) -> Set[str]:
         """
         获取任务的所有上游任务（包括间接上游）
-        
+
         Args:
             task_id: 任务ID
-            
+
         Returns:
             上游任务ID集合
         """
-        result = set()
-        queue = deque([task_id])
-        visited = set()
-        
-        while queue:
-            current = queue.popleft()
-            visited.add(current)
-            
-            for upstream in self.dependencies.get(current, set()):
-                result.add(upstream)
-                if upstream not in visited:
-                    queue.append(upstream)
-                    
-        return result
+        if self._upstream_closure is None:
+            self._build_closures()
+        return set(self._upstream_closure.get(task_id, ()))
     
     def visualize(self, filename: str = None) -> None:
         """
@@ -349,43 +499,159 @@ class DAG:
         except ImportError:
             logger.warning("无法导入graphviz库，无法生成可视化图形。请安装：pip install graphviz")
             return
-            
+
+        # 以节点和边生成拓扑指纹，结构未变化且输出文件仍存在时跳过graphviz渲染
+        nodes = sorted((task_id, task.task_type) for task_id, task in self.tasks.items())
+        edges = sorted(
+            (upstream, downstream)
+            for downstream, upstreams in self.dependencies.items()
+            for upstream in upstreams
+        )
+        graph_hash = hashlib.blake2b(repr((nodes, edges)).encode('utf-8'), digest_size=8).hexdigest()
+        if (filename and self._visualize_cache == (graph_hash, filename)
+                and os.path.exists(f"{filename}.pdf")):
+            logger.info(f"工作流拓扑未变化，复用已有可视化文件: {filename}.pdf")
+            return
+
         dot = graphviz.Digraph(comment=f'DAG: {self.name}')
-        
+
         # 添加节点
         for task_id, task in self.tasks.items():
             dot.node(task_id, label=f"{task_id}\n({task.task_type})")
-            
+
         # 添加边
         for downstream, upstreams in self.dependencies.items():
             for upstream in upstreams:
                 dot.edge(upstream, downstream)
-                
+
         # 渲染
         if filename:
             dot.render(filename, view=True)
+            self._visualize_cache = (graph_hash, filename)
         else:
             print(dot.source)
 
 
+class _ExecutionHistory:
+    """
+    执行历史的列式存储
+
+    时间戳等数值字段存入array.array（每行8字节），其余字段存入并行列表，
+    长期运行、执行次数很多的工作流不再为每条记录维护一个完整dict。
+    对外仍表现为可len/下标/迭代的记录序列，访问时按需拼装成dict，
+    原有的history[-1]["status"]等用法不受影响。
+
+    maxlen限制保留的记录条数，超出后淘汰最旧的一条，长驻进程的
+    历史内存占用保持O(maxlen)而非随执行次数无限增长。
+    """
+
+    def __init__(self, maxlen: Optional[int] = None):
+        self.maxlen = maxlen
+        self._start_time = array.array('d')
+        self._end_time = array.array('d')
+        self._duration = array.array('d')
+        self._status = []
+        self._params = []
+        self._start_from = []
+        self._end_at = []
+        self._only_tasks = []
+        self._backfill_date = []
+        self._completed_tasks = []
+        self._failed_task_id = []
+        self._error_message = []
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """追加一条执行记录，record为与历史版本相同结构的字典"""
+        if self.maxlen is not None and len(self._start_time) >= self.maxlen:
+            self._pop_oldest()
+        self._start_time.append(record["start_time"])
+        self._end_time.append(record["end_time"])
+        self._duration.append(record["duration"])
+        self._status.append(record["status"])
+        self._params.append(record["params"])
+        self._start_from.append(record["start_from"])
+        self._end_at.append(record["end_at"])
+        self._only_tasks.append(record["only_tasks"])
+        self._backfill_date.append(record["backfill_date"])
+        self._completed_tasks.append(record["completed_tasks"])
+        self._failed_task_id.append(record["failed_task_id"])
+        self._error_message.append(record["error_message"])
+
+    def _pop_oldest(self) -> None:
+        """淘汰最旧的一条记录"""
+        del self._start_time[0]
+        del self._end_time[0]
+        del self._duration[0]
+        del self._status[0]
+        del self._params[0]
+        del self._start_from[0]
+        del self._end_at[0]
+        del self._only_tasks[0]
+        del self._backfill_date[0]
+        del self._completed_tasks[0]
+        del self._failed_task_id[0]
+        del self._error_message[0]
+
+    def _make_record(self, index: int) -> Dict[str, Any]:
+        """按行号拼装单条执行记录"""
+        return {
+            "start_time": self._start_time[index],
+            "end_time": self._end_time[index],
+            "duration": self._duration[index],
+            "status": self._status[index],
+            "params": self._params[index],
+            "start_from": self._start_from[index],
+            "end_at": self._end_at[index],
+            "only_tasks": self._only_tasks[index],
+            "backfill_date": self._backfill_date[index],
+            "completed_tasks": self._completed_tasks[index],
+            "failed_task_id": self._failed_task_id[index],
+            "error_message": self._error_message[index]
+        }
+
+    def __len__(self) -> int:
+        return len(self._start_time)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._make_record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("执行历史下标越界")
+        return self._make_record(index)
+
+    def __iter__(self):
+        return (self._make_record(i) for i in range(len(self)))
+
+
 class Workflow:
     """工作流类，包装DAG并提供更多扩展功能"""
     
-    def __init__(self, name: str, description: str = ""):
+    def __init__(self, name: str, description: str = "",
+                 memoize: bool = False, cache_dir: str = ".wf_cache",
+                 history_size: int = 1000):
         """
         初始化工作流
-        
+
         Args:
             name: 工作流名称
             description: 工作流描述
+            memoize: 是否启用任务结果缓存，命中时直接复用上次的结果跳过执行
+            cache_dir: 结果缓存目录，相对路径时基于任务的data_path参数
+            history_size: 保留的执行历史条数上限，0表示不记录执行历史
         """
         self.name = name
         self.description = description
         self.dag = DAG(name, description)
-        self.execution_history = []
+        self._history_enabled = history_size != 0
+        self.execution_history = _ExecutionHistory(maxlen=history_size)  # 列式存储，支持len/下标/迭代
         self.fail_fast = True  # 默认失败即终止整个工作流
         self.send_alert_on_failure = False  # 默认不发送告警
-        
+        self.max_workers = None  # 并行执行的最大线程数，默认为就绪任务数
+        self.memoize = memoize
+        self.cache_dir = cache_dir
+
     def add_task(self, task: Task) -> 'Workflow':
         """
         添加任务
@@ -413,7 +679,7 @@ class Workflow:
         self.dag.set_dependency(upstream_task_id, downstream_task_id)
         return self
         
-    def set_params(self, params: Dict[str, Any]) -> 'Workflow':
+    def set_params(self, params: Mapping[str, Any]) -> 'Workflow':
         """
         设置全局参数
         
@@ -438,7 +704,41 @@ class Workflow:
         """
         self.fail_fast = fail_fast
         return self
-    
+
+    def set_max_workers(self, max_workers: Optional[int]) -> 'Workflow':
+        """
+        设置并行执行的最大线程数
+
+        Args:
+            max_workers: 最大线程数，None表示不限制（默认为就绪任务数）
+
+        Returns:
+            当前工作流对象，用于链式调用
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers必须大于等于1")
+        self.max_workers = max_workers
+        return self
+
+    def set_memoize(self, memoize: bool, cache_dir: str = ".wf_cache") -> 'Workflow':
+        """
+        设置是否启用任务结果缓存
+
+        启用后Python任务的结果按内容寻址缓存：以任务ID、函数字节码、
+        解析后的参数和上游结果（含上游输出文件的mtime）计算摘要作为键，
+        重复执行且输入未变化时直接复用缓存结果，跳过任务执行。
+
+        Args:
+            memoize: 是否启用结果缓存
+            cache_dir: 缓存目录，相对路径时基于任务的data_path参数
+
+        Returns:
+            当前工作流对象，用于链式调用
+        """
+        self.memoize = memoize
+        self.cache_dir = cache_dir
+        return self
+
     def enable_feishu_alert(self, webhook_url: str, **kwargs) -> 'Workflow':
         """
         启用飞书告警
@@ -465,14 +765,14 @@ class Workflow:
         return self
         
     def execute(self, start_from: Optional[str] = None, end_at: Optional[str] = None,
-               only_tasks: Optional[List[str]] = None, backfill_date: Optional[str] = None) -> Dict[str, Any]:
+               only_tasks: Optional[Collection[str]] = None, backfill_date: Optional[str] = None) -> Dict[str, Any]:
         """
         执行工作流
-        
+
         Args:
             start_from: 开始执行的任务ID
             end_at: 结束执行的任务ID
-            only_tasks: 只执行指定的任务列表
+            only_tasks: 只执行指定的任务集合，list/set/frozenset均可
             backfill_date: 回溯日期，用于在告警中显示
             
         Returns:
@@ -488,89 +788,94 @@ class Workflow:
         error_message = None
         
         try:
-            # 获取拓扑排序后的任务组
-            task_levels = self.dag.topological_sort()
-            
-            # 确定要执行的任务
-            tasks_to_execute = set()
-            if only_tasks:
-                # 如果只执行特定任务，验证这些任务存在
-                for task_id in only_tasks:
-                    if task_id not in self.dag.tasks:
-                        raise ValueError(f"任务 {task_id} 不存在")
-                    tasks_to_execute.add(task_id)
+            # 确定要执行的任务（校验与筛选逻辑与DAG.execute共用）
+            # 无任何筛选条件的全量执行是最常见场景，直接复用缓存的frozenset，
+            # 省去集合拷贝和逐任务的存在性校验
+            full_run = not (only_tasks or start_from or end_at)
+            if full_run:
+                tasks_to_execute = self.dag.task_id_set
             else:
-                # 如果没有指定特定任务，则执行全部任务
-                # 但可能根据start_from和end_at进行筛选
-                tasks_to_execute = set(self.dag.tasks.keys())
-            
-            # 如果指定了start_from，过滤出该任务及其所有下游任务
-            if start_from:
-                if start_from not in self.dag.tasks:
-                    raise ValueError(f"开始任务 {start_from} 不存在")
-                    
-                # 从start_from开始的所有下游任务
-                downstream_tasks = self.dag._get_downstream_tasks(start_from)
-                # 添加start_from本身
-                downstream_tasks.add(start_from)
-                
-                # 更新要执行的任务集合
-                tasks_to_execute &= downstream_tasks
-            
-            # 如果指定了end_at，过滤出该任务及其所有上游任务
-            if end_at:
-                if end_at not in self.dag.tasks:
-                    raise ValueError(f"结束任务 {end_at} 不存在")
-                    
-                # 获取end_at及其所有上游任务
-                upstream_tasks = self.dag._get_upstream_tasks(end_at)
-                # 添加end_at本身
-                upstream_tasks.add(end_at)
-                
-                # 更新要执行的任务集合
-                tasks_to_execute &= upstream_tasks
-            
-            # 存储一份最初计划执行的任务集合（用于后续计算未执行任务）
-            planned_tasks = tasks_to_execute.copy()
-            
-            # 执行筛选后的任务
+                tasks_to_execute = self.dag._plan(start_from, end_at, only_tasks)
+
+            # 最初计划执行的任务集合（用于后续计算未执行任务）；
+            # tasks_to_execute在调度过程中不会被修改，直接引用即可
+            planned_tasks = tasks_to_execute
+
+            # 结构变更后的首次执行先做环路校验（topological_sort通过后
+            # 置_frozen），结构未变的后续执行直接跳过；环路在提交任何
+            # 任务之前即被拒绝，而不是调度中途才发现
+            if not self.dag._frozen:
+                self.dag.topological_sort()
+
+            # 使用增量Kahn算法调度任务：任务的所有上游一旦完成便立即提交执行，
+            # 不再按层级划分，消除了同层任务之间的执行屏障，独立分支可以重叠执行
             results = {}
-            for level in task_levels:
-                level_tasks = [task_id for task_id in level if task_id in tasks_to_execute]
-                
-                if not level_tasks:
-                    continue
-                    
-                logger.info(f"执行任务级别: {level_tasks}")
-                
-                # 这里可以实现并行执行逻辑，目前是顺序执行
-                for task_id in level_tasks:
-                    task = self.dag.tasks[task_id]
-                    # 获取所有上游任务结果传递给当前任务
-                    upstream_results = {up_id: results[up_id] for up_id in self.dag.dependencies.get(task_id, set()) if up_id in results}
-                    
-                    # 替换任务中的参数
-                    task.resolve_params(self.dag.param_manager)
-                    
-                    # 执行任务（使用重试机制）
-                    logger.info(f"开始执行任务: {task_id}")
-                    task_start_time = time.time()
-                    try:
-                        task_result = task.execute_with_retry(upstream_results)
+            dep_tuples = self.dag._get_dep_tuples()  # 上游元组索引，循环内零分配取用
+            if full_run:
+                # 全量执行时所有上游必然在执行集合内，无需逐任务求交集
+                in_degree = {
+                    task_id: len(dep_tuples.get(task_id, ()))
+                    for task_id in tasks_to_execute
+                }
+            else:
+                # 仅统计执行集合内部的依赖关系，集合外的上游任务不阻塞调度
+                in_degree = {
+                    task_id: sum(1 for up_id in dep_tuples.get(task_id, ()) if up_id in tasks_to_execute)
+                    for task_id in tasks_to_execute
+                }
+            ready = deque(task_id for task_id, degree in in_degree.items() if degree == 0)
+            done_queue = queue.Queue()  # 任务完成通知队列
+            running = 0
+            finished = 0
+            total = len(tasks_to_execute)
+
+            max_workers = self.max_workers or max(1, total)
+            rev_dep_tuples = self.dag._get_rev_dep_tuples()  # 冻结的下游索引
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while finished < total:
+                    # 提交所有就绪任务
+                    while ready:
+                        task_id = ready.popleft()
+                        task = self.dag.tasks[task_id]
+                        # 获取所有上游任务结果传递给当前任务
+                        # （in results过滤保留：子集执行时集合外的上游没有结果）
+                        upstream_results = {up_id: results[up_id] for up_id in dep_tuples.get(task_id, ()) if up_id in results}
+
+                        # 替换任务中的参数
+                        task.resolve_params(self.dag.param_manager)
+
+                        # 提交任务执行（使用重试机制）
+                        logger.info("开始执行任务: %s", task_id)
+                        executor.submit(self._run_task, task, upstream_results, done_queue)
+                        running += 1
+
+                    if running == 0:
+                        # 既没有在执行的任务也没有就绪任务，说明DAG中存在环路
+                        raise ValueError("DAG中存在环路，无法完成调度")
+
+                    # 等待任一任务完成
+                    task_id, task_result, task_error = done_queue.get()
+                    running -= 1
+                    finished += 1
+
+                    if task_error is None:
                         results[task_id] = task_result
                         completed_tasks.append(task_id)
-                        duration = time.time() - task_start_time
-                        logger.info(f"任务 {task_id} 执行成功，耗时 {duration:.2f} 秒")
-                    except Exception as e:
-                        duration = time.time() - task_start_time
-                        error_message = str(e)
+                    else:
+                        error_message = str(task_error)
                         failed_task_id = task_id
-                        logger.error(f"任务 {task_id} 执行失败，耗时 {duration:.2f} 秒: {error_message}")
-                        
+
                         # 如果设置了快速失败，则立即中断整个工作流
                         if self.fail_fast:
-                            raise
-            
+                            raise task_error
+
+                    # 递减下游任务的入度，入度归零的任务立即就绪
+                    for downstream_id in rev_dep_tuples.get(task_id, ()):
+                        if downstream_id in in_degree:
+                            in_degree[downstream_id] -= 1
+                            if in_degree[downstream_id] == 0:
+                                ready.append(downstream_id)
+
             status = "SUCCESS"
             
             # 如果启用了告警，发送工作流成功的告警
@@ -592,7 +897,8 @@ class Workflow:
             # 如果启用了告警并且有失败任务，发送告警
             if self.send_alert_on_failure and failed_task_id:
                 # 计算未执行的任务
-                executed_tasks = set(completed_tasks + [failed_task_id])
+                executed_tasks = set(completed_tasks)
+                executed_tasks.add(failed_task_id)
                 uncompleted_tasks = sorted(list(planned_tasks - executed_tasks))
                 
                 # 发送告警，包含未执行任务列表
@@ -611,36 +917,153 @@ class Workflow:
             end_time = time.time()
             duration = end_time - start_time
             
-            # 记录执行历史
-            execution_record = {
-                "start_time": start_time,
-                "end_time": end_time,
-                "duration": duration,
-                "status": status,
-                "params": copy.deepcopy(self.dag.param_manager.params),
-                "start_from": start_from,
-                "end_at": end_at,
-                "only_tasks": only_tasks,
-                "backfill_date": backfill_date,
-                "completed_tasks": completed_tasks,
-                "failed_task_id": failed_task_id,
-                "error_message": error_message
-            }
-            self.execution_history.append(execution_record)
+            # 记录执行历史（history_size=0时跳过，省去参数快照开销）
+            if self._history_enabled:
+                execution_record = {
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": duration,
+                    "status": status,
+                    "params": _snapshot_params(self.dag.param_manager.params),
+                    "start_from": start_from,
+                    "end_at": end_at,
+                    "only_tasks": sorted(only_tasks) if only_tasks else only_tasks,
+                    "backfill_date": backfill_date,
+                    "completed_tasks": completed_tasks,
+                    "failed_task_id": failed_task_id,
+                    "error_message": error_message
+                }
+                self.execution_history.append(execution_record)
             
             log_msg = f"工作流 {self.name} 执行完成，状态: {status}，耗时: {duration:.2f} 秒"
             if backfill_date:
                 log_msg += f"，回溯日期: {backfill_date}"
             logger.info(log_msg)
+
+            # 失败告警留在合并窗口内由定时器聚合后台发送：连续回溯在同一
+            # 任务上反复失败时合并为一张卡片，这里不做强制flush（否则每次
+            # execute都会立刻清空合并窗口，逐日期各发一条）；进程退出时由
+            # alert_manager注册的atexit钩子兜底发送，告警不会丢失
             
         return results
-    
-    def get_execution_history(self) -> List[Dict[str, Any]]:
+
+    def _run_task(self, task: Task, upstream_results: Dict[str, Any], done_queue: "queue.Queue") -> None:
+        """
+        在工作线程中执行单个任务，并将完成情况通知调度主循环
+
+        Args:
+            task: 任务对象
+            upstream_results: 上游任务的执行结果字典
+            done_queue: 任务完成通知队列，元素为(task_id, result, error)
+        """
+        task_start_time = time.time()
+        try:
+            cache_file = self._memo_cache_file(task, upstream_results)
+            cached_result = self._load_memo_result(task, cache_file)
+            if cached_result is not None:
+                logger.info("任务 %s 命中结果缓存，跳过执行", task.task_id)
+                done_queue.put((task.task_id, cached_result, None))
+                return
+
+            task_result = task.execute_with_retry(upstream_results)
+            duration = time.time() - task_start_time
+            logger.info("任务 %s 执行成功，耗时 %.2f 秒", task.task_id, duration)
+            self._save_memo_result(task, cache_file, task_result)
+            done_queue.put((task.task_id, task_result, None))
+        except Exception as e:
+            duration = time.time() - task_start_time
+            logger.error("任务 %s 执行失败，耗时 %.2f 秒: %s", task.task_id, duration, str(e))
+            done_queue.put((task.task_id, None, e))
+
+    def _memo_cache_file(self, task: Task, upstream_results: Dict[str, Any]) -> Optional[str]:
+        """
+        计算任务的结果缓存文件路径
+
+        缓存键由任务ID、Python函数字节码、解析后的参数和上游结果摘要
+        （上游结果中包含output_file时附带文件mtime，文件变化即失效）构成。
+        仅对Python任务生效；缓存键不可序列化时放弃缓存，照常执行。
+
+        Args:
+            task: 任务对象
+            upstream_results: 上游任务的执行结果字典
+
+        Returns:
+            缓存文件路径，不启用缓存或任务不支持缓存时返回None
+        """
+        if not self.memoize or getattr(task, 'python_callable', None) is None:
+            return None
+
+        try:
+            # 上游结果摘要：结果内容 + 输出文件的mtime（上游文件更新后下游缓存自动失效）
+            upstream_hashes = []
+            for up_id in sorted(upstream_results):
+                up_result = upstream_results[up_id]
+                output_file = up_result.get('output_file') if isinstance(up_result, dict) else None
+                mtime = os.stat(output_file).st_mtime_ns if output_file and os.path.exists(output_file) else None
+                upstream_hashes.append((up_id, json.dumps(up_result, sort_keys=True, default=str), mtime))
+
+            key = hashlib.blake2b(
+                pickle.dumps((task.task_id, task.python_callable.__code__.co_code,
+                              sorted(task.params.items()), upstream_hashes)),
+                digest_size=16
+            ).hexdigest()
+        except (TypeError, pickle.PicklingError, OSError):
+            return None
+
+        cache_dir = self.cache_dir
+        if not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(task.params.get('data_path') or '.', cache_dir)
+        return os.path.join(cache_dir, f"{task.task_id}_{key}.json")
+
+    @staticmethod
+    def _load_memo_result(task: Task, cache_file: Optional[str]) -> Optional[Any]:
+        """
+        尝试读取缓存的任务结果
+
+        Args:
+            task: 任务对象
+            cache_file: 缓存文件路径，可能为None
+
+        Returns:
+            缓存的结果，未命中或缓存结果指向的输出文件已不存在时返回None
+        """
+        if not cache_file or not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 结果中记录的输出文件已被删除时视为失效，重新执行任务
+        if isinstance(result, dict) and result.get('output_file') and not os.path.exists(result['output_file']):
+            return None
+        return result
+
+    @staticmethod
+    def _save_memo_result(task: Task, cache_file: Optional[str], result: Any) -> None:
+        """
+        将任务结果写入缓存，结果不可JSON序列化时静默跳过
+
+        Args:
+            task: 任务对象
+            cache_file: 缓存文件路径，可能为None
+            result: 任务执行结果
+        """
+        if not cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+        except (OSError, TypeError, ValueError):
+            logger.debug(f"任务 {task.task_id} 结果缓存写入失败，忽略")
+
+    def get_execution_history(self) -> Sequence[Dict[str, Any]]:
         """
         获取工作流执行历史
-        
+
         Returns:
-            执行历史记录列表
+            执行历史记录序列，支持len/下标/迭代，每条记录为字典
         """
         return self.execution_history
     
@@ -14,28 +14,134 @@
 
 版本历史：
 - v1.0 (2024-07-11): 初始版本
+- v1.1 (2024-08-06): 预编译占位符正则并缓存模板切分结果，加速参数替换
 """
 
 import re
 import datetime
-from typing import Dict, Any, Optional, Union
+import functools
+from typing import Dict, Any, Mapping, Optional, Union, Tuple
+
+# 模块加载时编译一次热路径正则，避免替换时反复查正则缓存：
+# _VAR_RE匹配${param}占位符，_DATE_RE匹配yyyyMMdd-1这类日期偏移变量名
+_VAR_RE = re.compile(r'\${([^}]+)}')
+_DATE_RE = re.compile(r'([a-zA-Z\-]+)([\+\-])(\d+)$')
+
+# 日期偏移操作符到符号的映射，免去每个日期占位符一次if/else分支
+_SIGN = {'+': 1, '-': -1}
+
+# 常用日期偏移的timedelta预先构建好共享使用（timedelta不可变，共享安全），
+# 调度场景绝大多数偏移落在前后一个月内，免去逐占位符的对象分配
+_COMMON_DELTAS = {d: datetime.timedelta(days=d) for d in range(-31, 32)}
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    将模板按${param}占位符切分为(文本片段, 变量名)序列
+
+    变量名为None表示字面量片段。同一模板（如回溯时逐日期复用的命令模板）
+    只解析一次，之后的替换只需遍历片段拼接，不再重新扫描正则。
+
+    Args:
+        template: 含${param}占位符的模板字符串
+
+    Returns:
+        片段元组，每项为(原始文本, 变量名或None)
+    """
+    segments = []
+    last_end = 0
+    for match in _VAR_RE.finditer(template):
+        if match.start() > last_end:
+            segments.append((template[last_end:match.start()], None))
+        segments.append((match.group(0), match.group(1)))
+        last_end = match.end()
+    if last_end < len(template):
+        segments.append((template[last_end:], None))
+    return tuple(segments)
+
+
+# 自定义日期格式记号到datetime格式的固定映射；
+# 正则大小写敏感，MM（月）与mm（分）互不冲突
+_DATE_FMT_MAP = {
+    'yyyy': '%Y',
+    'MM': '%m',
+    'dd': '%d',
+    'HH': '%H',
+    'mm': '%M',
+    'ss': '%S',
+}
+_DATE_FMT_RE = re.compile('|'.join(map(re.escape, _DATE_FMT_MAP)))
+
+
+@functools.lru_cache(maxsize=128)
+def _convert_to_python_date_format(format_str: str) -> str:
+    """
+    将自定义日期格式转换为Python的datetime格式
+
+    所有记号在一趟正则扫描中完成替换，不再对格式串做六次replace；
+    一个工作流中出现的日期格式通常只有几种，结果带缓存，
+    同一格式只转换一次，之后直接命中缓存。
+
+    Args:
+        format_str: 自定义日期格式
+
+    Returns:
+        Python日期格式字符串
+    """
+    return _DATE_FMT_RE.sub(lambda m: _DATE_FMT_MAP[m.group(0)], format_str)
+
+
+@functools.lru_cache(maxsize=256)
+def _fmt_date(py_format: str, ordinal: int) -> str:
+    """
+    按(格式, 日期序数)缓存strftime结果
+
+    同一轮渲染中相同的日期占位符（如大量SQL里的${yyyyMMdd-1}）反复出现，
+    缓存后每个(格式, 日期)组合只调用一次strftime。仅用于不含时分秒的
+    纯日期格式，调用方负责判断。
+
+    Args:
+        py_format: Python日期格式字符串
+        ordinal: 日期的toordinal()序数
+
+    Returns:
+        格式化后的日期字符串
+    """
+    return datetime.date.fromordinal(ordinal).strftime(py_format)
 
 
 class ParamManager:
     """参数管理器，处理参数传递和替换"""
-    
+
+    # 嵌套引用迭代展开的最大轮数，超出视为参数定义成环，按当前结果返回
+    _MAX_RESOLVE_ROUNDS = 8
+
+
     def __init__(self):
         """初始化参数管理器"""
         self.params = {}
-        
-    def set_params(self, params: Dict[str, Any]) -> None:
+        self.version = 0  # 参数每次变更时递增，供任务侧判断解析结果是否可复用
+        self._resolve_cache = {}  # 模板到解析结果的缓存，参数变更时整体清空
+        self._str_cache = {}  # 非字符串参数值的字符串化缓存，参数变更时整体清空
+        self._date_token_seen = False  # 本次解析是否用到了日期偏移变量
+
+    def set_params(self, params: Mapping[str, Any]) -> None:
         """
         设置参数字典
-        
+
         Args:
-            params: 参数字典
+            params: 参数映射，dict/ChainMap等Mapping均可
         """
-        self.params.update(params)
+        # 单参数更新是常见场景（逐个注册参数），直接赋值省去update的迭代开销
+        if len(params) == 1:
+            key, value = next(iter(params.items()))
+            self.params[key] = value
+        else:
+            self.params.update(params)
+        self.version += 1
+        self._resolve_cache.clear()
+        self._str_cache.clear()
         
     def get_param(self, key: str, default: Any = None) -> Any:
         """
@@ -48,7 +154,11 @@ class ParamManager:
         Returns:
             参数值或默认值
         """
-        return self.params.get(key, default)
+        # 声明过的参数基本都能命中，try/except让命中路径少走.get的默认值分支
+        try:
+            return self.params[key]
+        except KeyError:
+            return default
     
     def resolve_value(self, value: str) -> str:
         """
@@ -60,79 +170,108 @@ class ParamManager:
         Returns:
             解析后的字符串
         """
-        if not isinstance(value, str):
+        if not isinstance(value, str) or '${' not in value:
             return value
-            
-        # 使用正则表达式找出所有的${param}格式的变量引用
-        pattern = r'\${([^}]+)}'
-        
-        def replace_var(match):
-            param_name = match.group(1)
-            
-            # 处理日期格式参数，如${yyyyMMdd-1}或${yyyy-MM-dd+7}等
-            date_pattern = r'([a-zA-Z\-]+)([\+\-])(\d+)'
-            date_match = re.match(date_pattern, param_name)
-            
-            if date_match:
-                # 解析日期格式参数
-                date_format = date_match.group(1)
-                operation = date_match.group(2)
-                days = int(date_match.group(3))
-                
-                # 根据操作符调整天数
-                if operation == '+':
-                    delta_days = days
-                else:  # operation == '-'
-                    delta_days = -days
-                    
-                # 计算日期
-                today = datetime.datetime.now()
-                target_date = today + datetime.timedelta(days=delta_days)
-                
-                # 将格式字符串转换为Python的datetime格式
-                py_format = self._convert_to_python_date_format(date_format)
-                return target_date.strftime(py_format)
-            
-            # 常规参数查找
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                # 如果参数值是字符串，递归解析
-                if isinstance(param_value, str):
-                    return self.resolve_value(param_value)
-                return str(param_value)
-            else:
-                # 如果参数不存在，保持原样
-                return match.group(0)
-                
-        # 替换所有变量引用
-        return re.sub(pattern, replace_var, value)
-    
-    def _convert_to_python_date_format(self, format_str: str) -> str:
+
+        # 同一模板在参数未变时解析结果相同，直接命中缓存；
+        # 含日期偏移变量的模板依赖当前时间，不进缓存（见下方判断）
+        cached = self._resolve_cache.get(value)
+        if cached is not None:
+            return cached
+
+        self._date_token_seen = False
+
+        # 迭代展开嵌套引用而非递归：每轮做一遍替换，到达不动点
+        # （无变化或不再含占位符）即停；轮数上限兜底参数互相引用
+        # 形成的环，不会再触发RecursionError
+        # 当前时间整个解析过程只取一次：多个日期占位符少做几次系统调用，
+        # 同一模板内的日期也保证基于同一时刻（跨午夜时不会错位）
+        now = datetime.datetime.now()
+
+        result = value
+        for _ in range(self._MAX_RESOLVE_ROUNDS):
+            # 模板切分结果带缓存，替换时只需遍历片段拼接
+            parts = []
+            for text, param_name in _split_template(result):
+                if param_name is None:
+                    parts.append(text)
+                else:
+                    parts.append(self._resolve_var(param_name, text, now))
+            new_result = ''.join(parts)
+
+            if new_result == result:
+                break
+            result = new_result
+            if '${' not in result:
+                break
+
+        # 未触达日期偏移变量时写缓存
+        if not self._date_token_seen:
+            if len(self._resolve_cache) >= 1024:
+                self._resolve_cache.clear()
+            self._resolve_cache[value] = result
+        return result
+
+    def _resolve_var(self, param_name: str, original: str,
+                     now: datetime.datetime) -> str:
         """
-        将自定义日期格式转换为Python的datetime格式
-        
+        解析单个变量引用
+
         Args:
-            format_str: 自定义日期格式
-            
+            param_name: 变量名，如day_id或yyyy-MM-dd-1
+            original: 原始占位符文本，变量无法解析时原样返回
+            now: 本次解析统一使用的当前时间，由resolve_value取一次后传入
+
         Returns:
-            Python日期格式字符串
+            解析后的字符串
         """
-        # 创建映射字典
-        mappings = {
-            'yyyy': '%Y',
-            'MM': '%m',
-            'dd': '%d',
-            'HH': '%H',
-            'mm': '%M',
-            'ss': '%S'
-        }
-        
-        # 替换映射
-        result = format_str
-        for key, value in mappings.items():
-            result = result.replace(key, value)
-            
-        return result 
+        # 处理日期格式参数，如${yyyyMMdd-1}或${yyyy-MM-dd+7}等；
+        # 普通变量名（不含+/-）先用一次子串判断挡掉，不进正则引擎
+        if '+' in param_name or '-' in param_name:
+            date_match = _DATE_RE.match(param_name)
+        else:
+            date_match = None
+
+        if date_match:
+            # 结果依赖当前时间，标记本次解析不可缓存
+            self._date_token_seen = True
+            # 解析日期格式参数（groups()一次取出三个分组，省去逐个group调用）
+            date_format, operation, days_str = date_match.groups()
+
+            # 根据操作符调整天数
+            delta_days = _SIGN[operation] * int(days_str)
+
+            # 计算日期（常用偏移直接取共享的timedelta）
+            delta = _COMMON_DELTAS.get(delta_days)
+            if delta is None:
+                delta = datetime.timedelta(days=delta_days)
+            target_date = now + delta
+
+            # 将格式字符串转换为Python的datetime格式
+            py_format = _convert_to_python_date_format(date_format)
+            # 含时分秒的格式依赖具体时刻，不走按天缓存
+            if '%H' in py_format or '%M' in py_format or '%S' in py_format:
+                return target_date.strftime(py_format)
+            return _fmt_date(py_format, target_date.toordinal())
+
+        # 常规参数查找
+        if param_name in self.params:
+            param_value = self.params[param_name]
+            # 字符串值原样返回，其中的嵌套引用由resolve_value的迭代循环继续展开
+            if isinstance(param_value, str):
+                return param_value
+            # 非字符串值的字符串化结果按参数名缓存，数值参数只转换一次
+            cached_str = self._str_cache.get(param_name)
+            if cached_str is None:
+                cached_str = format(param_value)
+                self._str_cache[param_name] = cached_str
+            return cached_str
+
+        # 如果参数不存在，保持原样
+        return original
+    
+    # 保留旧入口，兼容按实例方法调用的外部代码，内部统一走缓存的模块函数
+    _convert_to_python_date_format = staticmethod(_convert_to_python_date_format)
 
 
 # 为了兼容性，创建ParamsManager作为ParamManager的别名
@@ -23,99 +23,301 @@ import os
 import re
 import sys
 import logging
+import selectors
+import shlex
 import subprocess
 import tempfile
 import threading
-import queue
 import time
+import types
+from collections import deque
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List, Union, Tuple
-import shlex
 
 from .params import ParamManager
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 日志配置交由使用方决定，库模块不在导入时调用basicConfig改写全局配置
 logger = logging.getLogger("task")
 
 
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    配置调度器默认日志格式
+
+    供脚本入口一次性调用；调用方已自行配置过handler时不做任何改动，
+    库内各模块只通过getLogger取logger，import不再有全局副作用。
+
+    Args:
+        level: 日志级别，默认INFO
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(
+            level=level,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+
+# 模块加载时编译一次${param}占位符正则，各任务类型共用，避免每次解析查正则缓存
+_PARAM_RE = re.compile(r'\${([^}]+)}')
+
+# _substitute中区分"参数缺失"与"参数值为None"的哨兵对象
+_MISSING = object()
+
+# 需要交给shell解释的元字符；命令不含这些字符时可以直接exec，
+# 省去一层/bin/sh -c的fork+exec。换行是命令分隔符，~需要shell做
+# 家目录展开，均不能直接exec
+_SHELL_META = frozenset(';|&$`<>*?()~\n')
+
+
+# 临时脚本优先写到tmpfs（/dev/shm），避开磁盘文件系统的日志/刷盘开销；
+# 不存在时（如macOS）退回系统默认临时目录
+_TEMP_SCRIPT_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def _write_temp_script(content: str, suffix: str) -> str:
+    """
+    将解析后的脚本/SQL内容写入临时文件
+
+    mkstemp直接拿到原生fd（内部即O_CREAT|O_EXCL），os.write一次写入后
+    关闭，不经过NamedTemporaryFile的Python文件对象包装；文件由调用方
+    在执行结束后负责删除。
+
+    Args:
+        content: 要写入的文本内容
+        suffix: 文件后缀，如'.py'或'.sql'
+
+    Returns:
+        临时文件路径
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=_TEMP_SCRIPT_DIR)
+    try:
+        os.write(fd, content.encode('utf-8'))
+    finally:
+        os.close(fd)
+    return path
+
+
+# 并发fork上限：DAG一次放行大量任务时，不设限的Popen会形成fork风暴，
+# 拖垮页缓存甚至触发OOM。信号量只在创建子进程的瞬间持有，不限制任务
+# 本身的并发执行；上限可通过SCHEDULER_MAX_PARALLEL调整，默认CPU核数
+_SPAWN_SEM = threading.Semaphore(
+    int(os.environ.get('SCHEDULER_MAX_PARALLEL', str(os.cpu_count() or 4)))
+)
+
+
+def _spawn(command, shell: bool = False, cwd: Optional[str] = None):
+    """
+    创建任务子进程，所有任务类型统一经此入口
+
+    stdout/stderr管道、二进制模式、close_fds等Popen参数在各任务类型间
+    完全一致，收敛到一处；同时经_SPAWN_SEM限制并发fork数量。
+
+    Args:
+        command: 命令字符串或参数列表
+        shell: 是否经shell执行
+        cwd: 子进程工作目录
+
+    Returns:
+        subprocess.Popen对象
+    """
+    with _SPAWN_SEM:
+        return subprocess.Popen(
+            command,
+            shell=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            universal_newlines=False,  # 使用二进制模式读取
+            bufsize=1,
+            close_fds=False  # 调度进程自身fd可控，跳过逐fd关闭循环，保留posix_spawn快速路径
+        )
+
+
+def _popen_args(resolved_command: str):
+    """
+    将解析后的命令转换为(Popen参数, 是否需要shell)
+
+    不含shell元字符的简单命令用shlex.split拆成列表直接exec，
+    每个任务少起一个/bin/sh中间进程；含元字符（管道、重定向、换行、
+    变量展开等）、以VAR=value环境变量赋值开头或引号不配对无法拆分的
+    命令仍交给shell执行。
+
+    Args:
+        resolved_command: 参数替换完成后的命令字符串
+
+    Returns:
+        Tuple[Union[str, List[str]], bool]: Popen的第一个参数和shell开关
+    """
+    if not any(c in _SHELL_META for c in resolved_command):
+        try:
+            args = shlex.split(resolved_command)
+        except ValueError:
+            return resolved_command, True
+        # 首个词含=是shell的环境变量赋值语法（FOO=bar cmd），不能直接exec
+        if args and '=' not in args[0]:
+            return args, False
+    return resolved_command, True
+
+def _substitute(text: str, params: Dict[str, Any]) -> str:
+    """
+    一趟替换文本中的${param}占位符
+
+    用_PARAM_RE.sub的C级替换引擎线性扫描一遍完成全部替换，
+    不再逐个匹配调用str.replace重扫整串；未定义的参数保持原样，
+    参数值中如含${...}也不会被二次替换。
+
+    Args:
+        text: 含${param}占位符的文本
+        params: 参数字典
+
+    Returns:
+        替换后的文本
+    """
+    # 不含占位符的文本（最常见情况）一次子串判断直接返回，不进正则引擎
+    if '${' not in text:
+        return text
+    # 预绑定params.get并用哨兵区分缺失，每个占位符只做一次字典查找；
+    # 参数值本身是str时跳过str()调用
+    get = params.get
+    def _repl(m):
+        value = get(m.group(1), _MISSING)
+        if value is _MISSING:
+            return m.group(0)
+        return value if type(value) is str else str(value)
+    return _PARAM_RE.sub(_repl, text)
+
+
+
 def stream_output(process, task_id):
     """
     实时处理子进程的输出流，同时收集完整输出
 
+    单线程selectors(Linux上为epoll)事件循环直接监听两个管道，
+    就绪时按64KB块读取并在换行处切分，多行日志合并为一次系统调用；
+    不再为每个管道起读线程、也没有逐行的队列传递和100ms轮询超时。
+    两个管道都读到EOF后等待进程退出，保证返回时returncode已就绪。
+
     Args:
         process: subprocess.Popen对象
         task_id: 任务ID，用于日志前缀
 
     Returns:
-        Tuple[str, str]: 完整的stdout和stderr内容
+        Tuple[str, str]: stdout和stderr内容（超出保留行数时只含末尾部分）
     """
-    def reader(pipe, pipe_name, output_queue):
-        try:
-            with pipe:
-                for line in iter(pipe.readline, b''):
-                    if not line:
-                        break
-                    line_str = line.decode('utf-8', errors='replace').rstrip()
-                    # 将数据放入队列
-                    output_queue.put((pipe_name, line_str))
-        except (ValueError, IOError) as e:
-            logger.error(f"读取{pipe_name}出错: {str(e)}")
-
-    # 创建队列和线程
-    output_queue = queue.Queue()
-    stdout_thread = threading.Thread(
-        target=reader, 
-        args=(process.stdout, "stdout", output_queue)
-    )
-    stderr_thread = threading.Thread(
-        target=reader, 
-        args=(process.stderr, "stderr", output_queue)
-    )
-    
-    # 启动线程
-    stdout_thread.daemon = True
-    stderr_thread.daemon = True
-    stdout_thread.start()
-    stderr_thread.start()
-    
-    # 收集完整输出
-    stdout_lines = []
-    stderr_lines = []
-    
-    # 等待线程结束或进程结束
-    while stdout_thread.is_alive() or stderr_thread.is_alive() or not output_queue.empty():
+    # 内存中只保留末尾若干行（环形缓冲），大输出任务（如Spark作业刷出
+    # 数百MB日志）不再把全部行囤在列表里撑爆RSS；保留行数可通过环境
+    # 变量SCHEDULER_LOG_TAIL调整
+    tail_lines = int(os.environ.get('SCHEDULER_LOG_TAIL', '2000'))
+    stdout_lines = deque(maxlen=tail_lines)
+    stderr_lines = deque(maxlen=tail_lines)
+
+    # 设置SCHEDULER_LOG_FILE_DIR时完整日志落盘到按任务命名的文件，
+    # 内存里截掉的部分仍可在磁盘上查到
+    log_file = None
+    log_dir = os.environ.get('SCHEDULER_LOG_FILE_DIR')
+    if log_dir:
         try:
-            # 从队列获取数据并处理
-            pipe_name, line = output_queue.get(timeout=0.1)
-            if pipe_name == "stdout":
-                stdout_lines.append(line)
-                print(f"[{task_id}] {line}")
-            else:  # stderr
-                stderr_lines.append(line)
-                print(f"[{task_id}][ERROR] {line}", file=sys.stderr)
-            output_queue.task_done()
-        except queue.Empty:
-            # 队列为空，检查进程是否结束
-            if process.poll() is not None and output_queue.empty():
-                break
-        except Exception as e:
-            logger.error(f"处理输出时出错: {str(e)}")
-    
-    # 确保线程结束
-    stdout_thread.join()
-    stderr_thread.join()
-    
-    # 返回完整的输出
+            log_file = tempfile.NamedTemporaryFile(
+                mode='w', encoding='utf-8', dir=log_dir,
+                prefix=f"{task_id}_", suffix=".log", delete=False
+            )
+            logger.info("任务 %s 完整日志写入: %s", task_id, log_file.name)
+        except OSError as e:
+            logger.error("创建日志文件失败: %s", str(e))
+            log_file = None
+
+    # 控制台输出按selector批次合并写：前缀只编码一次，每批日志一次
+    # buffer.write加一次flush，不再逐行print（每行一次格式化+stdout锁）
+    stdout_prefix = f"[{task_id}] ".encode('utf-8')
+    stderr_prefix = f"[{task_id}][ERROR] ".encode('utf-8')
+    out_batch = bytearray()
+    err_batch = bytearray()
+
+    def dispatch(pipe_name, line_str):
+        if pipe_name == "stdout":
+            stdout_lines.append(line_str)
+            out_batch.extend(stdout_prefix)
+            out_batch.extend(line_str.encode('utf-8', errors='replace'))
+            out_batch.extend(b'\n')
+            if log_file is not None:
+                log_file.write(line_str + '\n')
+        else:  # stderr
+            stderr_lines.append(line_str)
+            err_batch.extend(stderr_prefix)
+            err_batch.extend(line_str.encode('utf-8', errors='replace'))
+            err_batch.extend(b'\n')
+            if log_file is not None:
+                log_file.write(f"[ERROR] {line_str}\n")
+
+    def flush_batches():
+        if out_batch:
+            sys.stdout.buffer.write(out_batch)
+            sys.stdout.buffer.flush()
+            out_batch.clear()
+        if err_batch:
+            sys.stderr.buffer.write(err_batch)
+            sys.stderr.buffer.flush()
+            err_batch.clear()
+
+    sel = selectors.DefaultSelector()
+    try:
+        for pipe, pipe_name in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+            if pipe is None:
+                continue
+            # 管道设为非阻塞，就绪后一次读走当前可读的所有数据
+            os.set_blocking(pipe.fileno(), False)
+            sel.register(pipe, selectors.EVENT_READ, (pipe_name, bytearray()))
+
+        while sel.get_map():
+            for key, _ in sel.select():
+                pipe_name, buffer = key.data
+                try:
+                    chunk = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    continue
+                except (ValueError, IOError) as e:
+                    logger.error("读取%s出错: %s", pipe_name, str(e))
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+
+                if not chunk:
+                    # EOF：输出剩余的不完整行并注销该管道
+                    if buffer:
+                        dispatch(pipe_name, buffer.decode('utf-8', errors='replace').rstrip())
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+
+                buffer.extend(chunk)
+                # 切分出所有完整行，行尾残留留在缓冲区等下一块
+                newline_pos = buffer.rfind(b'\n')
+                if newline_pos < 0:
+                    continue
+                complete = bytes(buffer[:newline_pos])
+                del buffer[:newline_pos + 1]
+                for raw_line in complete.split(b'\n'):
+                    dispatch(pipe_name, raw_line.decode('utf-8', errors='replace').rstrip())
+            # 一个selector批次的所有行合并为一次写+flush
+            flush_batches()
+    finally:
+        flush_batches()
+        sel.close()
+
+    # 输出已全部读完，等待进程退出以便调用方直接读取returncode
+    process.wait()
+
+    if log_file is not None:
+        log_file.close()
+
+    # 返回收集到的输出（最多末尾tail_lines行）
     return '\n'.join(stdout_lines), '\n'.join(stderr_lines)
 
 
 class Task(ABC):
     """任务抽象基类，定义了所有任务的通用接口"""
     
-    def __init__(self, task_id: str, task_type: str, params: Optional[Dict[str, Any]] = None, max_retries: int = 3):
+    def __init__(self, task_id: str, task_type: str, params: Optional[Dict[str, Any]] = None, max_retries: int = 3,
+                 stream: bool = True):
         """
         初始化任务
         
@@ -124,12 +326,37 @@ class Task(ABC):
             task_type: 任务类型
             params: 任务参数
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
         self.task_id = task_id
         self.task_type = task_type
-        self.params = params or {}
+        # 参数键是少量重复的短字符串（day_id、data_path等），intern后不同任务
+        # 共享同一键对象，字典查找可走指针相等的快路径，也省去重复的键内存
+        self.params = {sys.intern(k): v for k, v in params.items()} if params else {}
         self.max_retries = max_retries
+        self.stream = stream
+        self._resolved_version: Optional[int] = None  # 上次解析参数时的参数管理器版本号
+        self._resolved_cache: Dict[str, str] = {}  # 模板解析结果缓存，参数变更时清空
         
+    def _collect_output(self, process) -> Tuple[str, str]:
+        """
+        读取子进程的stdout和stderr并等待进程退出
+
+        stream开启（默认）时走stream_output实时转发日志；无人盯日志的
+        批量DAG跑批可关闭stream，改用communicate()的C级读取循环一次性
+        取回输出，省去selector事件循环的逐行处理。
+
+        Args:
+            process: subprocess.Popen对象
+
+        Returns:
+            Tuple[str, str]: stdout和stderr内容
+        """
+        if self.stream:
+            return stream_output(process, self.task_id)
+        out, err = process.communicate()
+        return out.decode('utf-8', 'replace'), err.decode('utf-8', 'replace')
+
     def set_param(self, key: str, value: Any) -> 'Task':
         """
         设置任务参数
@@ -141,7 +368,9 @@ class Task(ABC):
         Returns:
             任务对象本身，用于链式调用
         """
-        self.params[key] = value
+        self.params[sys.intern(key)] = value
+        self._resolved_version = None  # 参数有新增/修改，下次重新解析
+        self._resolved_cache.clear()
         return self
         
     def get_param(self, key: str, default: Any = None) -> Any:
@@ -160,15 +389,24 @@ class Task(ABC):
     def resolve_params(self, param_manager: ParamManager) -> None:
         """
         解析任务中的参数引用，使用参数管理器替换变量引用
-        
+
+        同一工作流重复执行（如多日期回溯）时参数往往没有变化，
+        按参数管理器的版本号判断，版本未变则直接复用上次的解析结果。
+
         Args:
             param_manager: 参数管理器
         """
+        if self._resolved_version == param_manager.version:
+            return
+
         # 遍历所有参数键值对
         for key, value in list(self.params.items()):
             if isinstance(value, str):
                 # 替换字符串中的变量引用
                 self.params[key] = param_manager.resolve_value(value)
+
+        self._resolved_version = param_manager.version
+        self._resolved_cache.clear()
     
     @abstractmethod
     def execute(self, upstream_results: Dict[str, Any] = None) -> Any:
@@ -203,21 +441,21 @@ class Task(ABC):
             try:
                 # 第一次执行
                 if retries == 0:
-                    logger.info(f"执行任务: {self.task_id}")
+                    logger.info("执行任务: %s", self.task_id)
                 # 重试执行
                 else:
                     # 指数退避策略: 重试等待时间为 2^(重试次数-1) 秒
                     wait_time = 2 ** (retries - 1)
-                    logger.info(f"重试任务 {self.task_id} (第{retries}次重试)，等待{wait_time}秒后执行...")
+                    logger.info("重试任务 %s (第%s次重试)，等待%s秒后执行...", self.task_id, retries, wait_time)
                     time.sleep(wait_time)
-                    logger.info(f"开始第{retries}次重试: {self.task_id}")
+                    logger.info("开始第%s次重试: %s", retries, self.task_id)
                 
                 # 执行任务
                 result = self.execute(upstream_results)
                 
                 # 如果执行成功，则返回结果
                 if retries > 0:
-                    logger.info(f"任务 {self.task_id} 在第{retries}次重试后成功")
+                    logger.info("任务 %s 在第%s次重试后成功", self.task_id, retries)
                 return result
                 
             except Exception as e:
@@ -226,9 +464,9 @@ class Task(ABC):
                 retries += 1
                 
                 if retries <= self.max_retries:
-                    logger.warning(f"任务 {self.task_id} 执行失败，将进行第{retries}次重试。错误: {str(e)}")
+                    logger.warning("任务 %s 执行失败，将进行第%s次重试。错误: %s", self.task_id, retries, str(e))
                 else:
-                    logger.error(f"任务 {self.task_id} 已重试{self.max_retries}次仍失败，不再重试。错误: {str(e)}")
+                    logger.error("任务 %s 已重试%s次仍失败，不再重试。错误: %s", self.task_id, self.max_retries, str(e))
                     break
         
         # 如果所有重试都失败，则抛出最后一次的异常
@@ -239,7 +477,7 @@ class ShellTask(Task):
     """Shell脚本任务，执行Shell命令或脚本"""
     
     def __init__(self, task_id: str, command: str, params: Optional[Dict[str, Any]] = None,
-                working_dir: Optional[str] = None, max_retries: int = 3):
+                working_dir: Optional[str] = None, max_retries: int = 3, stream: bool = True):
         """
         初始化Shell任务
         
@@ -249,11 +487,12 @@ class ShellTask(Task):
             params: 任务参数
             working_dir: 工作目录
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
-        super().__init__(task_id, "shell", params, max_retries)
+        super().__init__(task_id, "shell", params, max_retries, stream)
         self.command = command
         self.working_dir = working_dir
-        
+
     def execute(self, upstream_results: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         执行Shell命令或脚本
@@ -268,25 +507,19 @@ class ShellTask(Task):
         resolved_command = self._resolve_command()
         
         # 执行Shell命令
-        logger.info(f"执行Shell命令: {resolved_command}")
+        logger.info("执行Shell命令: %s", resolved_command)
         try:
+            # 简单命令直接exec，只有含shell元字符的命令才经过/bin/sh
+            popen_cmd, needs_shell = _popen_args(resolved_command)
             # 创建子进程，设置stdout和stderr为管道
-            process = subprocess.Popen(
-                resolved_command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.working_dir,
-                universal_newlines=False,  # 使用二进制模式读取
-                bufsize=1
-            )
+            process = _spawn(popen_cmd, shell=needs_shell, cwd=self.working_dir)
             
             # 实时处理输出
-            stdout, stderr = stream_output(process, self.task_id)
+            stdout, stderr = self._collect_output(process)
             exit_code = process.returncode
             
             if exit_code != 0:
-                logger.error(f"Shell命令执行失败: {stderr}")
+                logger.error("Shell命令执行失败: %s", stderr)
                 raise Exception(f"Shell命令退出码 {exit_code}: {stderr}")
                 
             return {
@@ -295,7 +528,7 @@ class ShellTask(Task):
                 "stderr": stderr
             }
         except Exception as e:
-            logger.error(f"Shell命令执行异常: {str(e)}")
+            logger.error("Shell命令执行异常: %s", str(e))
             raise
     
     def _resolve_command(self) -> str:
@@ -305,29 +538,31 @@ class ShellTask(Task):
         Returns:
             解析后的命令
         """
-        # 替换命令中的参数引用
-        resolved_command = self.command
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, self.command)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_command = resolved_command.replace(match.group(0), str(param_value))
-                
+        # 同一任务重复执行（重试、回溯）时模板和参数多半未变，结果直接复用
+        cached = self._resolved_cache.get('command')
+        if cached is not None:
+            return cached
+
+        # 一趟替换命令中的参数引用
+        resolved_command = _substitute(self.command, self.params)
+        self._resolved_cache['command'] = resolved_command
         return resolved_command
 
 
 class PythonTask(Task):
-    """Python脚本任务，执行Python脚本"""
+    """
+    Python脚本任务，执行Python脚本
+
+    script_path/script_content模式每个任务启动一个独立解释器，
+    换取工作目录、模块状态和退出码的完全隔离；大量小Python任务
+    需要摊薄解释器启动开销时，建议改用func参数传入可调用对象，
+    在调度进程内直接执行，无子进程开销。
+    """
     
     def __init__(self, task_id: str, script_path: Optional[str] = None, 
                  python_callable: Optional[callable] = None, script_content: Optional[str] = None,
                  params: Optional[Dict[str, Any]] = None, custom_command: Optional[str] = None,
-                 working_dir: Optional[str] = None, max_retries: int = 3):
+                 working_dir: Optional[str] = None, max_retries: int = 3, stream: bool = True):
         """
         初始化Python任务
         
@@ -341,8 +576,9 @@ class PythonTask(Task):
                 例如: "python {script_path} {params.day_id} {params.table_list}"
             working_dir: 工作目录
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
-        super().__init__(task_id, "python", params, max_retries)
+        super().__init__(task_id, "python", params, max_retries, stream)
         
         # 检查参数，至少提供一种执行方式
         if not any([script_path, python_callable, script_content]):
@@ -353,7 +589,29 @@ class PythonTask(Task):
         self.script_content = script_content
         self.custom_command = custom_command
         self.working_dir = working_dir
-        
+        self._resolved_script_path: Optional[str] = None  # 首次访问时解析并缓存
+
+    @property
+    def resolved_script_path(self) -> str:
+        """
+        解析后的脚本绝对路径
+
+        script_path与working_dir构造后不再变化，路径在首次访问时解析
+        一次并缓存；os.path.abspath背后是一次getcwd系统调用，不再每次
+        执行都触发。
+
+        Returns:
+            脚本绝对路径，未提供script_path时为空字符串
+        """
+        if self._resolved_script_path is None:
+            if not self.script_path:
+                self._resolved_script_path = ''
+            elif self.working_dir and not os.path.isabs(self.script_path):
+                self._resolved_script_path = os.path.join(self.working_dir, self.script_path)
+            else:
+                self._resolved_script_path = os.path.abspath(self.script_path)
+        return self._resolved_script_path
+
     def execute(self, upstream_results: Dict[str, Any] = None) -> Any:
         """
         执行Python脚本或函数
@@ -366,7 +624,7 @@ class PythonTask(Task):
         """
         # 如果提供了可调用函数，直接调用
         if self.python_callable:
-            logger.info(f"执行Python函数: {self.python_callable.__name__}")
+            logger.info("执行Python函数: %s", self.python_callable.__name__)
             try:
                 # 将任务参数和上游结果传递给函数
                 kwargs = {**self.params}
@@ -375,7 +633,7 @@ class PythonTask(Task):
                     
                 return self.python_callable(**kwargs)
             except Exception as e:
-                logger.error(f"Python函数执行失败: {str(e)}")
+                logger.error("Python函数执行失败: %s", str(e))
                 raise
         
         # 如果提供了自定义命令模板，使用模板构建命令
@@ -384,24 +642,18 @@ class PythonTask(Task):
             resolved_command = self._resolve_custom_command()
             
             # 执行命令
-            logger.info(f"执行自定义Python命令: {resolved_command}")
+            logger.info("执行自定义Python命令: %s", resolved_command)
             try:
-                process = subprocess.Popen(
-                    resolved_command,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    cwd=self.working_dir,
-                    universal_newlines=False,  # 使用二进制模式读取
-                    bufsize=1
-                )
+                # 简单命令直接exec，只有含shell元字符的命令才经过/bin/sh
+                popen_cmd, needs_shell = _popen_args(resolved_command)
+                process = _spawn(popen_cmd, shell=needs_shell, cwd=self.working_dir)
                 
                 # 实时处理输出
-                stdout, stderr = stream_output(process, self.task_id)
+                stdout, stderr = self._collect_output(process)
                 exit_code = process.returncode
                 
                 if exit_code != 0:
-                    logger.error(f"自定义Python命令执行失败: {stderr}")
+                    logger.error("自定义Python命令执行失败: %s", stderr)
                     raise Exception(f"自定义Python命令退出码 {exit_code}: {stderr}")
                     
                 return {
@@ -410,23 +662,15 @@ class PythonTask(Task):
                     "stderr": stderr
                 }
             except Exception as e:
-                logger.error(f"自定义Python命令执行异常: {str(e)}")
+                logger.error("自定义Python命令执行异常: %s", str(e))
                 raise
         
         # 如果提供了脚本路径，使用stream_output函数进行实时输出处理
         elif self.script_path:
-            # 解析脚本路径
-            # 如果设置了工作目录且脚本路径是相对路径，则基于工作目录解析
-            script_path = self.script_path
-            if self.working_dir and not os.path.isabs(script_path):
-                script_path = os.path.join(self.working_dir, script_path)
-            else:
-                script_path = os.path.abspath(script_path)
-            
-            # 构建命令
+            # 构建命令，脚本路径解析缓存在resolved_script_path
             command = [
                 "python", 
-                script_path
+                self.resolved_script_path
             ]
             
             # 添加参数
@@ -434,23 +678,16 @@ class PythonTask(Task):
                 command.append(f"--{key}={value}")
                 
             # 执行命令
-            logger.info(f"执行Python脚本: {' '.join(command)}")
+            logger.info("执行Python脚本: %s", ' '.join(command))
             try:
-                process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    cwd=self.working_dir,
-                    universal_newlines=False,  # 使用二进制模式读取
-                    bufsize=1
-                )
+                process = _spawn(command, cwd=self.working_dir)
                 
                 # 实时处理输出
-                stdout, stderr = stream_output(process, self.task_id)
+                stdout, stderr = self._collect_output(process)
                 exit_code = process.returncode
                 
                 if exit_code != 0:
-                    logger.error(f"Python脚本执行失败: {stderr}")
+                    logger.error("Python脚本执行失败: %s", stderr)
                     raise Exception(f"Python脚本退出码 {exit_code}: {stderr}")
                     
                 return {
@@ -459,7 +696,7 @@ class PythonTask(Task):
                     "stderr": stderr
                 }
             except Exception as e:
-                logger.error(f"Python脚本执行异常: {str(e)}")
+                logger.error("Python脚本执行异常: %s", str(e))
                 raise
                 
         # 如果提供了脚本内容，创建临时文件执行
@@ -468,9 +705,7 @@ class PythonTask(Task):
             resolved_script = self._resolve_script_content()
             
             # 创建临时文件
-            with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp_file:
-                temp_file_path = temp_file.name
-                temp_file.write(resolved_script.encode('utf-8'))
+            temp_file_path = _write_temp_script(resolved_script, '.py')
                 
             try:
                 # 构建命令
@@ -481,22 +716,15 @@ class PythonTask(Task):
                     command.append(f"--{key}={value}")
                     
                 # 执行命令
-                logger.info(f"执行临时Python脚本: {' '.join(command)}")
-                process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    cwd=self.working_dir,
-                    universal_newlines=False,  # 使用二进制模式读取
-                    bufsize=1
-                )
+                logger.info("执行临时Python脚本: %s", ' '.join(command))
+                process = _spawn(command, cwd=self.working_dir)
                 
                 # 实时处理输出
-                stdout, stderr = stream_output(process, self.task_id)
+                stdout, stderr = self._collect_output(process)
                 exit_code = process.returncode
                 
                 if exit_code != 0:
-                    logger.error(f"临时Python脚本执行失败: {stderr}")
+                    logger.error("临时Python脚本执行失败: %s", stderr)
                     raise Exception(f"临时Python脚本退出码 {exit_code}: {stderr}")
                     
                 return {
@@ -505,7 +733,7 @@ class PythonTask(Task):
                     "stderr": stderr
                 }
             except Exception as e:
-                logger.error(f"临时Python脚本执行异常: {str(e)}")
+                logger.error("临时Python脚本执行异常: %s", str(e))
                 raise
             finally:
                 # 删除临时文件
@@ -520,22 +748,16 @@ class PythonTask(Task):
         """
         if not self.script_content:
             return ""
-            
-        # 替换脚本内容中的参数引用
-        resolved_script = self.script_content
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, self.script_content)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_script = resolved_script.replace(match.group(0), str(param_value))
-                
+
+        cached = self._resolved_cache.get('script_content')
+        if cached is not None:
+            return cached
+
+        # 一趟替换脚本内容中的参数引用
+        resolved_script = _substitute(self.script_content, self.params)
+        self._resolved_cache['script_content'] = resolved_script
         return resolved_script
-        
+
     def _resolve_custom_command(self) -> str:
         """
         解析自定义命令模板中的参数引用
@@ -545,36 +767,28 @@ class PythonTask(Task):
         """
         if not self.custom_command:
             return ""
-            
-        # 创建格式化参数字典
-        # 解析脚本路径，如果设置了工作目录且路径是相对路径，则基于工作目录解析
-        script_path = ''
-        if self.script_path:
-            if self.working_dir and not os.path.isabs(self.script_path):
-                script_path = os.path.join(self.working_dir, self.script_path)
-            else:
-                script_path = os.path.abspath(self.script_path)
-                
+
+        cached = self._resolved_cache.get('custom_command')
+        if cached is not None:
+            return cached
+
+        # 用SimpleNamespace暴露params.PARAM_NAME格式的属性访问：
+        # 只做一次C层字典更新，不再每次调用都动态创建类对象
         format_args = {
-            'script_path': script_path
+            'script_path': self.resolved_script_path,
+            'params': types.SimpleNamespace(**self.params),
         }
         
-        # 添加params.PARAM_NAME格式的参数
-        params_dict = {}
-        for key, value in self.params.items():
-            params_dict[key] = value
-            
-        format_args['params'] = type('ParamsNamespace', (), params_dict)
-        
         # 格式化命令
         try:
             resolved_command = self.custom_command.format(**format_args)
+            self._resolved_cache['custom_command'] = resolved_command
             return resolved_command
         except KeyError as e:
-            logger.error(f"自定义命令模板中存在未知参数: {e}")
+            logger.error("自定义命令模板中存在未知参数: %s", e)
             raise ValueError(f"自定义命令模板中存在未知参数: {e}")
         except Exception as e:
-            logger.error(f"解析自定义命令模板失败: {e}")
+            logger.error("解析自定义命令模板失败: %s", e)
             raise ValueError(f"解析自定义命令模板失败: {e}")
 
 
@@ -583,7 +797,8 @@ class PySparkTask(Task):
     
     def __init__(self, task_id: str, script_path: Optional[str] = None, 
                  script_content: Optional[str] = None, params: Optional[Dict[str, Any]] = None,
-                 spark_config: Optional[Dict[str, str]] = None, working_dir: Optional[str] = None, max_retries: int = 3):
+                 spark_config: Optional[Dict[str, str]] = None, working_dir: Optional[str] = None, max_retries: int = 3,
+                 stream: bool = True):
         """
         初始化PySpark任务
         
@@ -595,8 +810,9 @@ class PySparkTask(Task):
             spark_config: Spark配置参数
             working_dir: 工作目录
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
-        super().__init__(task_id, "pyspark", params, max_retries)
+        super().__init__(task_id, "pyspark", params, max_retries, stream)
         
         # 检查参数，必须提供script_path或script_content中的一个
         if not script_path and not script_content:
@@ -623,9 +839,7 @@ class PySparkTask(Task):
             resolved_script = self._resolve_script_content()
             
             # 创建临时文件
-            with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp_file:
-                script_path = temp_file.name
-                temp_file.write(resolved_script.encode('utf-8'))
+            script_path = _write_temp_script(resolved_script, '.py')
         else:
             # 解析脚本路径
             script_path = self.script_path
@@ -638,18 +852,11 @@ class PySparkTask(Task):
             # 构建spark-submit命令
             command = ["spark-submit"]
             
-            # 处理spark_config中的参数引用
-            resolved_spark_config = {}
+            # 解析spark_config中的参数引用并拼入命令，一趟完成，
+            # 不再先攒一个中间字典再二次遍历
             for key, value in self.spark_config.items():
                 if isinstance(value, str):
-                    # 替换字符串中的参数引用
-                    resolved_value = self._resolve_value(value)
-                    resolved_spark_config[key] = resolved_value
-                else:
-                    resolved_spark_config[key] = value
-            
-            # 添加Spark配置
-            for key, value in resolved_spark_config.items():
+                    value = self._resolve_value(value)
                 command.append("--conf")
                 command.append(f"{key}={value}")
                 
@@ -661,23 +868,16 @@ class PySparkTask(Task):
                 command.append(f"--{key}={value}")
                 
             # 执行命令
-            cmd_str = ' '.join(command)
-            logger.info(f"执行PySpark命令: {cmd_str}")
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.working_dir,
-                universal_newlines=False,  # 使用二进制模式读取
-                bufsize=1
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("执行PySpark命令: %s", ' '.join(command))
+            process = _spawn(command, cwd=self.working_dir)
             
             # 实时处理输出
-            stdout, stderr = stream_output(process, self.task_id)
+            stdout, stderr = self._collect_output(process)
             exit_code = process.returncode
             
             if exit_code != 0:
-                logger.error(f"PySpark脚本执行失败: {stderr}")
+                logger.error("PySpark脚本执行失败: %s", stderr)
                 raise Exception(f"PySpark脚本退出码 {exit_code}: {stderr}")
                 
             return {
@@ -686,7 +886,7 @@ class PySparkTask(Task):
                 "stderr": stderr
             }
         except Exception as e:
-            logger.error(f"PySpark脚本执行异常: {str(e)}")
+            logger.error("PySpark脚本执行异常: %s", str(e))
             raise
         finally:
             # 如果使用了临时文件，删除它
@@ -709,20 +909,8 @@ class PySparkTask(Task):
         if not value or not isinstance(value, str):
             return value
             
-        # 替换字符串中的参数引用
-        resolved_value = value
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, value)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_value = resolved_value.replace(match.group(0), str(param_value))
-                
-        return resolved_value
+        # 一趟替换字符串中的参数引用
+        return _substitute(value, self.params)
     
     def _resolve_script_content(self) -> str:
         """
@@ -734,20 +922,8 @@ class PySparkTask(Task):
         if not self.script_content:
             return ""
             
-        # 替换脚本内容中的参数引用
-        resolved_script = self.script_content
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, self.script_content)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_script = resolved_script.replace(match.group(0), str(param_value))
-                
-        return resolved_script
+        # 一趟替换脚本内容中的参数引用
+        return _substitute(self.script_content, self.params)
 
 
 class SparkSQLTask(Task):
@@ -756,7 +932,8 @@ class SparkSQLTask(Task):
     def __init__(self, task_id: str, sql: Optional[str] = None, sql_file: Optional[str] = None,
                 params: Optional[Dict[str, Any]] = None, 
                 spark_config: Optional[Dict[str, str]] = None, working_dir: Optional[str] = None,
-                init_script: Optional[Union[str, List[str]]] = None, max_retries: int = 3):
+                init_script: Optional[Union[str, List[str]]] = None, max_retries: int = 3,
+                stream: bool = True):
         """
         初始化Spark SQL任务
         
@@ -769,8 +946,9 @@ class SparkSQLTask(Task):
             working_dir: 工作目录
             init_script: 初始化脚本路径，通过-i选项加载，可以是单个脚本路径或多个脚本路径的列表
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
-        super().__init__(task_id, "spark-sql", params, max_retries)
+        super().__init__(task_id, "spark-sql", params, max_retries, stream)
         
         # 检查参数，必须提供sql或sql_file中的一个
         if not sql and not sql_file:
@@ -781,7 +959,7 @@ class SparkSQLTask(Task):
         self.spark_config = spark_config or {}
         self.working_dir = working_dir
         self.init_script = init_script
-        
+
     def execute(self, upstream_results: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         执行Spark SQL查询
@@ -796,12 +974,10 @@ class SparkSQLTask(Task):
         if self.sql:
             # 替换SQL中的参数引用
             resolved_sql = self._resolve_sql()
-            logger.info(f"执行SQL查询: {resolved_sql}")
+            logger.info("执行SQL查询: %s", resolved_sql)
             
             # 创建临时文件
-            with tempfile.NamedTemporaryFile(suffix='.sql', delete=False) as temp_file:
-                sql_file = temp_file.name
-                temp_file.write(resolved_sql.encode('utf-8'))
+            sql_file = _write_temp_script(resolved_sql, '.sql')
                 
         else:
             # 解析SQL文件路径
@@ -815,16 +991,17 @@ class SparkSQLTask(Task):
             try:
                 with open(sql_file_path, 'r', encoding='utf-8') as f:
                     sql_content = f.read()
-                    
-                # 替换SQL文件中的参数引用
-                resolved_sql = self._resolve_sql_content(sql_content)
-                
-                # 重新写入临时文件
-                with tempfile.NamedTemporaryFile(suffix='.sql', delete=False) as temp_file:
-                    sql_file = temp_file.name
-                    temp_file.write(resolved_sql.encode('utf-8'))
+
+                # 不含占位符的SQL文件直接用原文件执行，
+                # 省去整个文件的重新编码和写盘
+                if '${' not in sql_content:
+                    sql_file = sql_file_path
+                else:
+                    # 替换SQL文件中的参数引用后重新写入临时文件
+                    resolved_sql = self._resolve_sql_content(sql_content)
+                    sql_file = _write_temp_script(resolved_sql, '.sql')
             except Exception as e:
-                logger.error(f"读取SQL文件失败: {str(e)}")
+                logger.error("读取SQL文件失败: %s", str(e))
                 raise
                 
         try:
@@ -853,18 +1030,11 @@ class SparkSQLTask(Task):
                 if "spark.sql.variable.substitution" not in self.spark_config:
                     self.spark_config["spark.sql.variable.substitution"] = "true"
             
-            # 处理spark_config中的参数引用
-            resolved_spark_config = {}
+            # 解析spark_config中的参数引用并拼入命令，一趟完成，
+            # 不再先攒一个中间字典再二次遍历
             for key, value in self.spark_config.items():
                 if isinstance(value, str):
-                    # 替换字符串中的参数引用
-                    resolved_value = self._resolve_value(value)
-                    resolved_spark_config[key] = resolved_value
-                else:
-                    resolved_spark_config[key] = value
-            
-            # 添加Spark配置
-            for key, value in resolved_spark_config.items():
+                    value = self._resolve_value(value)
                 command.append("--conf")
                 command.append(f"{key}={value}")
                 
@@ -877,23 +1047,16 @@ class SparkSQLTask(Task):
                 command.append(f"{key}={value}")
                 
             # 执行命令
-            cmd_str = ' '.join(command)
-            logger.info(f"执行Spark SQL命令: {cmd_str}")
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.working_dir,
-                universal_newlines=False,  # 使用二进制模式读取
-                bufsize=1
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("执行Spark SQL命令: %s", ' '.join(command))
+            process = _spawn(command, cwd=self.working_dir)
             
             # 实时处理输出
-            stdout, stderr = stream_output(process, self.task_id)
+            stdout, stderr = self._collect_output(process)
             exit_code = process.returncode
             
             if exit_code != 0:
-                logger.error(f"Spark SQL执行失败: {stderr}")
+                logger.error("Spark SQL执行失败: %s", stderr)
                 raise Exception(f"Spark SQL退出码 {exit_code}: {stderr}")
                 
             return {
@@ -902,11 +1065,12 @@ class SparkSQLTask(Task):
                 "stderr": stderr
             }
         except Exception as e:
-            logger.error(f"Spark SQL执行异常: {str(e)}")
+            logger.error("Spark SQL执行异常: %s", str(e))
             raise
         finally:
             # 如果使用了临时文件，删除它
-            if 'sql_file' in locals() and (self.sql or sql_file != self.sql_file):
+            # 仅删除本次执行生成的临时文件，原SQL文件保留
+            if 'sql_file' in locals() and (self.sql or sql_file != sql_file_path):
                 try:
                     os.unlink(sql_file)
                 except Exception:
@@ -925,30 +1089,25 @@ class SparkSQLTask(Task):
         if not value or not isinstance(value, str):
             return value
             
-        # 替换字符串中的参数引用
-        resolved_value = value
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, value)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_value = resolved_value.replace(match.group(0), str(param_value))
-                
-        return resolved_value
+        # 一趟替换字符串中的参数引用
+        return _substitute(value, self.params)
     
     def _resolve_sql(self) -> str:
         """
         解析SQL中的参数引用
-        
+
         Returns:
             解析后的SQL
         """
-        return self._resolve_sql_content(self.sql)
-        
+        cached = self._resolved_cache.get('sql')
+        if cached is not None:
+            return cached
+
+        # 一趟替换SQL中的参数引用
+        resolved_sql = _substitute(self.sql, self.params)
+        self._resolved_cache['sql'] = resolved_sql
+        return resolved_sql
+
     def _resolve_sql_content(self, sql_content: str) -> str:
         """
         解析SQL内容中的参数引用
@@ -962,20 +1121,8 @@ class SparkSQLTask(Task):
         if not sql_content:
             return ""
             
-        # 替换SQL内容中的参数引用
-        resolved_sql = sql_content
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, sql_content)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_sql = resolved_sql.replace(match.group(0), str(param_value))
-                
-        return resolved_sql
+        # 一趟替换SQL内容中的参数引用
+        return _substitute(sql_content, self.params)
 
 
 class HiveSQLTask(Task):
@@ -984,7 +1131,8 @@ class HiveSQLTask(Task):
     def __init__(self, task_id: str, sql: Optional[str] = None, sql_file: Optional[str] = None,
                 params: Optional[Dict[str, Any]] = None, 
                 hive_config: Optional[Dict[str, str]] = None, working_dir: Optional[str] = None,
-                init_script: Optional[Union[str, List[str]]] = None, max_retries: int = 3):
+                init_script: Optional[Union[str, List[str]]] = None, max_retries: int = 3,
+                stream: bool = True):
         """
         初始化Hive SQL任务
         
@@ -997,8 +1145,9 @@ class HiveSQLTask(Task):
             working_dir: 工作目录
             init_script: 初始化脚本路径，通过-i选项加载，可以是单个脚本路径或多个脚本路径的列表
             max_retries: 最大重试次数，默认为3
+            stream: 是否实时转发子进程输出，关闭后改用communicate()一次性读取
         """
-        super().__init__(task_id, "hive", params, max_retries)
+        super().__init__(task_id, "hive", params, max_retries, stream)
         
         # 检查参数，必须提供sql或sql_file中的一个
         if not sql and not sql_file:
@@ -1024,12 +1173,10 @@ class HiveSQLTask(Task):
         if self.sql:
             # 替换SQL中的参数引用
             resolved_sql = self._resolve_sql()
-            logger.info(f"执行SQL查询: {resolved_sql}")
+            logger.info("执行SQL查询: %s", resolved_sql)
             
             # 创建临时文件
-            with tempfile.NamedTemporaryFile(suffix='.sql', delete=False) as temp_file:
-                sql_file = temp_file.name
-                temp_file.write(resolved_sql.encode('utf-8'))
+            sql_file = _write_temp_script(resolved_sql, '.sql')
                 
         else:
             # 解析SQL文件路径
@@ -1043,16 +1190,17 @@ class HiveSQLTask(Task):
             try:
                 with open(sql_file_path, 'r', encoding='utf-8') as f:
                     sql_content = f.read()
-                    
-                # 替换SQL文件中的参数引用
-                resolved_sql = self._resolve_sql_content(sql_content)
-                
-                # 重新写入临时文件
-                with tempfile.NamedTemporaryFile(suffix='.sql', delete=False) as temp_file:
-                    sql_file = temp_file.name
-                    temp_file.write(resolved_sql.encode('utf-8'))
+
+                # 不含占位符的SQL文件直接用原文件执行，
+                # 省去整个文件的重新编码和写盘
+                if '${' not in sql_content:
+                    sql_file = sql_file_path
+                else:
+                    # 替换SQL文件中的参数引用后重新写入临时文件
+                    resolved_sql = self._resolve_sql_content(sql_content)
+                    sql_file = _write_temp_script(resolved_sql, '.sql')
             except Exception as e:
-                logger.error(f"读取SQL文件失败: {str(e)}")
+                logger.error("读取SQL文件失败: %s", str(e))
                 raise
                 
         try:
@@ -1077,19 +1225,12 @@ class HiveSQLTask(Task):
                     
                     command.extend(["-i", init_script_path])
             
-            # 处理hive_config中的参数引用
-            resolved_hive_config = {}
+            # 解析hive_config中的参数引用并拼入命令，一趟完成，
+            # 不再先攒一个中间字典再二次遍历
             for key, value in self.hive_config.items():
                 if isinstance(value, str):
-                    # 替换字符串中的参数引用
-                    resolved_value = self._resolve_value(value)
-                    resolved_hive_config[key] = resolved_value
-                else:
-                    resolved_hive_config[key] = value
-            
-            # 添加Hive配置
-            for key, value in resolved_hive_config.items():
-                command.append(f"--hiveconf")
+                    value = self._resolve_value(value)
+                command.append("--hiveconf")
                 command.append(f"{key}={value}")
                 
             # 添加SQL文件
@@ -1101,23 +1242,16 @@ class HiveSQLTask(Task):
                 command.append(f"{key}={value}")
                 
             # 执行命令
-            cmd_str = ' '.join(command)
-            logger.info(f"执行Hive SQL命令: {cmd_str}")
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.working_dir,
-                universal_newlines=False,  # 使用二进制模式读取
-                bufsize=1
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("执行Hive SQL命令: %s", ' '.join(command))
+            process = _spawn(command, cwd=self.working_dir)
             
             # 实时处理输出
-            stdout, stderr = stream_output(process, self.task_id)
+            stdout, stderr = self._collect_output(process)
             exit_code = process.returncode
             
             if exit_code != 0:
-                logger.error(f"Hive SQL执行失败: {stderr}")
+                logger.error("Hive SQL执行失败: %s", stderr)
                 raise Exception(f"Hive SQL退出码 {exit_code}: {stderr}")
                 
             return {
@@ -1126,11 +1260,12 @@ class HiveSQLTask(Task):
                 "stderr": stderr
             }
         except Exception as e:
-            logger.error(f"Hive SQL执行异常: {str(e)}")
+            logger.error("Hive SQL执行异常: %s", str(e))
             raise
         finally:
             # 如果使用了临时文件，删除它
-            if 'sql_file' in locals() and (self.sql or sql_file != self.sql_file):
+            # 仅删除本次执行生成的临时文件，原SQL文件保留
+            if 'sql_file' in locals() and (self.sql or sql_file != sql_file_path):
                 try:
                     os.unlink(sql_file)
                 except Exception:
@@ -1149,20 +1284,8 @@ class HiveSQLTask(Task):
         if not value or not isinstance(value, str):
             return value
             
-        # 替换字符串中的参数引用
-        resolved_value = value
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, value)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_value = resolved_value.replace(match.group(0), str(param_value))
-                
-        return resolved_value
+        # 一趟替换字符串中的参数引用
+        return _substitute(value, self.params)
     
     def _resolve_sql(self) -> str:
         """
@@ -1171,7 +1294,13 @@ class HiveSQLTask(Task):
         Returns:
             解析后的SQL
         """
-        return self._resolve_sql_content(self.sql)
+        cached = self._resolved_cache.get('sql')
+        if cached is not None:
+            return cached
+
+        resolved_sql = self._resolve_sql_content(self.sql)
+        self._resolved_cache['sql'] = resolved_sql
+        return resolved_sql
         
     def _resolve_sql_content(self, sql_content: str) -> str:
         """
@@ -1186,17 +1315,5 @@ class HiveSQLTask(Task):
         if not sql_content:
             return ""
             
-        # 替换SQL内容中的参数引用
-        resolved_sql = sql_content
-        
-        # 使用正则表达式查找所有${param}格式的参数
-        pattern = r'\${([^}]+)}'
-        matches = re.finditer(pattern, sql_content)
-        
-        for match in matches:
-            param_name = match.group(1)
-            if param_name in self.params:
-                param_value = self.params[param_name]
-                resolved_sql = resolved_sql.replace(match.group(0), str(param_value))
-                
-        return resolved_sql 
\ No newline at end of file
+        # 一趟替换SQL内容中的参数引用
+        return _substitute(sql_content, self.params) 
\ No newline at end of file
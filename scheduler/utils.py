@@ -19,30 +19,56 @@
 import os
 import re
 import datetime
+import functools
 import logging
 import json
 from typing import Dict, Any, Optional, Union, List, Tuple
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# 日志配置交由使用方决定，库模块不在导入时调用basicConfig改写全局配置
 logger = logging.getLogger("utils")
 
 
+# 依赖具体时刻的格式记号（时分秒、微秒、秒级时间戳），含这些记号的
+# 格式不能按天缓存，否则一天内反复返回同一个过期时间
+_TIME_TOKEN_RE = re.compile(r'%[HMSfs]')
+
+
+@functools.lru_cache(maxsize=64)
+def _get_date_cached(date_format: str, days_delta: int, day_ordinal: int) -> str:
+    """
+    按(格式, 偏移量, 当天序数)缓存日期字符串
+
+    Args:
+        date_format: 日期格式
+        days_delta: 天数偏移量
+        day_ordinal: 当天的序数，跨天后变化使缓存自动失效
+
+    Returns:
+        日期字符串
+    """
+    target_date = datetime.datetime.now() + datetime.timedelta(days=days_delta)
+    return target_date.strftime(date_format)
+
+
 def get_date(date_format: str = '%Y-%m-%d', days_delta: int = 0) -> str:
     """
     获取日期字符串
-    
+
+    同一天内相同格式和偏移量的调用直接命中缓存，
+    避免参数展开过程中重复的strftime格式化；含时分秒等
+    时刻记号的格式依赖当前时间，每次实时计算不进缓存。
+
     Args:
         date_format: 日期格式
         days_delta: 天数偏移量，可正可负
-        
+
     Returns:
         日期字符串
     """
-    target_date = datetime.datetime.now() + datetime.timedelta(days=days_delta)
-    return target_date.strftime(date_format)
+    if _TIME_TOKEN_RE.search(date_format):
+        target = datetime.datetime.now() + datetime.timedelta(days=days_delta)
+        return target.strftime(date_format)
+    return _get_date_cached(date_format, days_delta, datetime.date.today().toordinal())
 
 
 def parse_date_expr(date_expr: str) -> str:
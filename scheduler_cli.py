@@ -52,16 +52,26 @@
 - v1.2 (2024/7/26): 增加实时日志输出功能
 - v1.3 (2024/7/26): 增加多时间参数支持，可以配置多个日期参数名称和格式
 - v1.4 (2024/7/29): 增加支持从指定节点开始执行功能
+- v1.5 (2024/8/5): 回溯参数支持parallelism，多个日期点可并行回溯
 """
 
 import argparse
+import functools
 import json
 import os
 import sys
 import time
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
+# numpy为可选依赖，安装后日期范围生成使用向量化实现（长区间回溯更快）
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # 导入本地模块
 from scheduler.dag import Workflow
 from scheduler.config import load_workflow_from_config
@@ -120,13 +130,22 @@ def get_date_range(start_date_str, end_date_str):
         if end_date < start_date:
             print("错误: 结束日期不能早于开始日期")
             sys.exit(1)
-            
+
+        # 优先使用numpy向量化生成日期序列，C层完成日期运算和格式化，
+        # 避免长区间回溯时逐日构造datetime对象
+        if np is not None:
+            dates = np.arange(
+                np.datetime64(start_date_str), np.datetime64(end_date_str) + 1,
+                dtype='datetime64[D]'
+            )
+            return dates.astype(str).tolist()
+
         date_range = []
         current_date = start_date
         while current_date <= end_date:
             date_range.append(current_date.strftime("%Y-%m-%d"))
             current_date += timedelta(days=1)
-        
+
         return date_range
     except ValueError as e:
         print(f"错误: 日期格式无效 (应为 YYYY-MM-DD): {str(e)}")
@@ -147,13 +166,22 @@ def get_week_range(start_date_str, end_date_str):
         start_weekday = start_date.weekday()
         if start_weekday > 0:  # 如果不是周一，则调整到这周的周一
             start_date = start_date - timedelta(days=start_weekday)
-        
+
+        # 优先使用numpy向量化生成按周序列（步长7天）
+        if np is not None:
+            dates = np.arange(
+                np.datetime64(start_date.strftime("%Y-%m-%d")),
+                np.datetime64(end_date_str) + 1,
+                np.timedelta64(7, 'D'), dtype='datetime64[D]'
+            )
+            return dates.astype(str).tolist()
+
         date_range = []
         current_date = start_date
         while current_date <= end_date:
             date_range.append(current_date.strftime("%Y-%m-%d"))
             current_date += timedelta(days=7)  # 增加一周
-        
+
         return date_range
     except ValueError as e:
         print(f"错误: 日期格式无效 (应为 YYYY-MM-DD): {str(e)}")
@@ -172,7 +200,16 @@ def get_month_range(start_date_str, end_date_str):
         
         # 调整到每月1号
         start_date = start_date.replace(day=1)
-        
+
+        # 优先使用numpy向量化生成按月序列（datetime64[M]按月步进）
+        if np is not None:
+            months = np.arange(
+                np.datetime64(start_date_str, 'M'),
+                np.datetime64(end_date_str, 'M') + 1,
+                dtype='datetime64[M]'
+            )
+            return months.astype('datetime64[D]').astype(str).tolist()
+
         date_range = []
         current_date = start_date
         while current_date <= end_date:
@@ -192,6 +229,125 @@ def get_month_range(start_date_str, end_date_str):
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=4096)
+def _format_date_cached(ordinal, format_str):
+    """按(日期序数, 格式)缓存strftime结果，重复回溯同一区间时直接命中缓存"""
+    return date.fromordinal(ordinal).strftime(format_str)
+
+
+def build_date_param_matrix(date_range, date_param_names, date_param_formats):
+    """
+    预生成日期参数矩阵：按"格式列"批量格式化后，转为逐日期的参数字典列表
+
+    每种格式只执行一轮格式化和一次异常处理（F种格式各扫一遍日期列表），
+    避免回溯循环内F×D次的逐日期逐格式调用。无破折号变体同样按列生成。
+
+    Args:
+        date_range: 日期字符串列表（YYYY-MM-DD）
+        date_param_names: 日期参数名列表
+        date_param_formats: 参数名到strftime格式的映射
+
+    Returns:
+        与date_range等长的列表，每项为该日期点的{参数名: 取值}字典
+    """
+    ordinals = [
+        datetime.strptime(date_point, "%Y-%m-%d").toordinal()
+        for date_point in date_range
+    ]
+
+    # 相同格式的参数共享同一列：每种唯一格式只格式化一轮，结果列表直接复用
+    # （格式为None表示参数未指定格式，使用默认YYYY-MM-DD）
+    format_groups = defaultdict(list)
+    for param_name in date_param_names:
+        format_groups[date_param_formats.get(param_name)].append(param_name)
+
+    columns = {}
+    for format_str, names in format_groups.items():
+        if format_str is None:
+            column = list(date_range)
+        else:
+            try:
+                column = [_format_date_cached(ordinal, format_str) for ordinal in ordinals]
+            except Exception as e:
+                print(f"警告: 格式化日期 {', '.join(names)} 失败: {str(e)}")
+                column = list(date_range)
+        for name in names:
+            columns[name] = column
+
+    # 添加特殊参数 - 无破折号格式，同一格式的无破折号列也只生成一次
+    no_dash_cache = {}
+    for param_name in date_param_names:
+        no_dash_name = f"{param_name}_no_dash"
+        if no_dash_name not in columns:
+            format_str = date_param_formats.get(param_name)
+            if format_str not in no_dash_cache:
+                no_dash_cache[format_str] = [
+                    value.replace("-", "") for value in columns[param_name]
+                ]
+            columns[no_dash_name] = no_dash_cache[format_str]
+
+    # 转为逐日期的记录形式
+    names = list(columns.keys())
+    return [
+        {name: columns[name][i] for name in names}
+        for i in range(len(date_range))
+    ]
+
+
+def validate_backfill_plan(workflow_config, date_param_names, date_param_formats):
+    """
+    回溯执行前的结构化预检
+
+    一次性检查配置中的结构性问题（重复/缺失的任务ID、悬空依赖、无效的
+    日期格式），让整个回溯窗口在真正执行前暴露问题，而不是逐个日期点
+    失败后才发现。
+
+    Args:
+        workflow_config: 工作流配置字典
+        date_param_names: 日期参数名列表
+        date_param_formats: 参数名到strftime格式的映射
+
+    Returns:
+        (errors, warnings)两个字符串列表，errors非空时不应执行真实回溯
+    """
+    errors = []
+    warnings = []
+
+    # 任务ID检查：缺失或重复
+    seen_task_ids = set()
+    for task_config in workflow_config.get("tasks", []):
+        task_id = task_config.get("task_id")
+        if not task_id:
+            errors.append("存在缺少task_id的任务配置")
+        elif task_id in seen_task_ids:
+            errors.append(f"任务ID重复: {task_id}")
+        else:
+            seen_task_ids.add(task_id)
+
+    # 依赖检查：from/to必须指向已定义的任务
+    for dep in workflow_config.get("dependencies", []):
+        for side in ("from", "to"):
+            value = dep.get(side)
+            if not value:
+                errors.append(f"依赖配置缺少{side}字段: {dep}")
+                continue
+            for task_id in (tid.strip() for tid in value.split(",")):
+                if task_id not in seen_task_ids:
+                    errors.append(f"依赖引用了未定义的任务: {task_id}")
+
+    # 日期格式检查：用固定样例日期试格式化一次
+    probe_date = datetime(2024, 1, 1, 12, 30, 45)
+    for name, format_str in date_param_formats.items():
+        if date_param_names and name not in date_param_names:
+            warnings.append(f"日期参数格式 {name} 未出现在date_param_names中，将被忽略")
+        try:
+            probe_date.strftime(format_str)
+        except (ValueError, TypeError) as e:
+            errors.append(f"日期参数 {name} 的格式无效: {format_str} ({str(e)})")
+
+    return errors, warnings
+
+
 def run_workflow(config_path, params_path=None, job_ids=None, start_from=None):
     """执行单个工作流"""
     print(f"开始执行工作流 [{config_path}]")
@@ -314,15 +470,30 @@ def run_workflow(config_path, params_path=None, job_ids=None, start_from=None):
         return False
 
 
-def run_backfill(config_path, backfill_params_path, job_ids=None, start_from=None, auto_confirm=False):
-    """执行数据回溯"""
+def run_backfill(config_path, backfill_params_path=None, job_ids=None, start_from=None,
+                 auto_confirm=False, backfill_params=None):
+    """执行数据回溯
+
+    回溯参数可以通过backfill_params_path提供文件路径，也可以通过backfill_params
+    直接传入参数字典（编程方式调用时无需写临时文件再读回）
+    """
     print(f"开始执行数据回溯 [{config_path}]")
-    
+
     # 加载工作流配置
     workflow_config = load_json_file(config_path)
-    
-    # 加载回溯参数
-    backfill_config = load_json_file(backfill_params_path)
+
+    # 加载回溯参数：优先使用直接传入的参数字典，否则从文件加载
+    if backfill_params is not None:
+        backfill_config = backfill_params
+    elif isinstance(backfill_params_path, dict):
+        # 兼容直接将参数字典作为第二个位置参数传入
+        backfill_config = backfill_params_path
+        backfill_params_path = None
+    elif backfill_params_path:
+        backfill_config = load_json_file(backfill_params_path)
+    else:
+        print("错误: 必须提供 backfill_params_path 或 backfill_params")
+        return False
     
     # 获取日期参数名称 - 支持单个参数名或多个参数名列表
     date_param_name = backfill_config.get("date_param_name", "day_id")
@@ -365,7 +536,23 @@ def run_backfill(config_path, backfill_params_path, job_ids=None, start_from=Non
     dry_run = backfill_config.get("dry_run", False)
     if dry_run:
         print("注意: 这是一次空运行，不会实际执行任务")
-    
+
+    # 执行前结构化预检：空运行把结果并入返回报告，真实回溯发现错误时
+    # 直接终止，避免整个日期区间逐点失败并逐点告警
+    validation_errors, validation_warnings = validate_backfill_plan(
+        workflow_config, date_param_names, date_param_formats
+    )
+    for warning in validation_warnings:
+        print(f"警告: {warning}")
+    if validation_errors:
+        print("\n预检发现以下配置错误:")
+        for error in validation_errors:
+            print(f"  - {error}")
+        if not dry_run:
+            print("真实回溯已终止，请修正配置后重试（可先用dry_run复查）")
+            return False
+
+
     # 获取自定义参数
     custom_params = backfill_config.get("params", {})
     
@@ -436,40 +623,21 @@ def run_backfill(config_path, backfill_params_path, job_ids=None, start_from=Non
             custom_command = task_config.get("custom_command")
             custom_command_tasks[task_id] = custom_command
     
-    for date_point in date_range:
+    # 预生成整个日期参数矩阵，每种格式只做一轮格式化，逐日期循环按行取用
+    date_objs = [datetime.strptime(date_point, "%Y-%m-%d") for date_point in date_range]
+    date_param_rows = build_date_param_matrix(date_range, date_param_names, date_param_formats)
+
+    def _run_single_date(date_index, date_point):
+        """回溯单个日期点，成功返回True，失败返回False，空运行返回None"""
         print(f"\n[{date_point}] 开始回溯...")
-        
+
         # 创建工作流配置副本，避免修改原始配置
         workflow_config_copy = json.loads(json.dumps(workflow_config))
-        
-        # 准备日期参数 - 根据配置生成不同格式的日期参数
-        date_obj = datetime.strptime(date_point, "%Y-%m-%d")
-        date_params = {}
-        
-        # 处理日期参数名列表
-        for param_name in date_param_names:
-            # 如果参数名有指定格式，则使用该格式
-            if param_name in date_param_formats:
-                format_str = date_param_formats[param_name]
-                try:
-                    # 将日期格式化为指定格式
-                    formatted_date = date_obj.strftime(format_str)
-                    date_params[param_name] = formatted_date
-                except Exception as e:
-                    print(f"警告: 格式化日期 {param_name} 失败: {str(e)}")
-                    # 如果格式化失败，使用默认格式
-                    date_params[param_name] = date_point
-            else:
-                # 如果没有指定格式，使用默认YYYY-MM-DD格式
-                date_params[param_name] = date_point
-        
-        # 添加特殊参数 - 无破折号格式
-        for param_name in date_param_names:
-            if f"{param_name}_no_dash" not in date_params:
-                if param_name in date_params:
-                    no_dash_value = date_params[param_name].replace("-", "")
-                    date_params[f"{param_name}_no_dash"] = no_dash_value
-        
+
+        # 取出预生成的该日期的参数行
+        date_obj = date_objs[date_index]
+        date_params = dict(date_param_rows[date_index])
+
         # 直接修改工作流配置中的参数，处理日期变量
         if "params" in workflow_config_copy:
             workflow_params = workflow_config_copy.get("params", {})
@@ -639,78 +807,94 @@ def run_backfill(config_path, backfill_params_path, job_ids=None, start_from=Non
             else:
                 print("    - 仅使用全局参数")
         
+        # 空运行只需展示参数物化结果，不必构建工作流对象
+        if dry_run:
+            print(f"[{date_point}] 空运行，跳过实际执行")
+            # 如果是空运行，显示将要传递的参数
+            print(f"  将传递以下参数:")
+            for key, value in day_params.items():
+                print(f"  - {key}: {value}")
+            return None
+
         # 基于更新后的配置创建工作流
         workflow = load_workflow_from_config(workflow_config_copy)
-        
+
         # 设置参数
         workflow.set_params(day_params)
-        
+
         # 执行工作流
-        if not dry_run:
-            start_time = time.time()
-            try:
-                # 在执行时传递当前回溯日期作为参数
-                results = workflow.execute(only_tasks=task_ids, start_from=start_from, backfill_date=date_point)
-                # 工作流执行到这里表示没有抛出异常，说明执行成功
-                success = True
-                elapsed = time.time() - start_time
+        start_time = time.time()
+        try:
+            # 在执行时传递当前回溯日期作为参数
+            results = workflow.execute(only_tasks=task_ids, start_from=start_from, backfill_date=date_point)
+            # 工作流执行到这里表示没有抛出异常，说明执行成功
+            success = True
+            elapsed = time.time() - start_time
+            
+            if success:
+                print(f"[{date_point}] ✅ 回溯成功 (用时: {elapsed:.2f}秒)")
+                return True
+            else:
+                print(f"[{date_point}] ❌ 回溯失败 (用时: {elapsed:.2f}秒)")
+                
+                # 确定应该执行的任务集合
+                tasks_to_execute = set()
                 
-                if success:
-                    success_count += 1
-                    print(f"[{date_point}] ✅ 回溯成功 (用时: {elapsed:.2f}秒)")
+                # 如果指定了特定任务
+                if task_ids:
+                    tasks_to_execute = set(task_ids)
+                # 如果从特定任务开始
+                elif start_from:
+                    # 获取start_from及其所有下游任务
+                    downstream_tasks = workflow.dag._get_downstream_tasks(start_from)
+                    downstream_tasks.add(start_from)
+                    tasks_to_execute = downstream_tasks
+                # 如果执行全部任务
                 else:
-                    failure_count += 1
-                    print(f"[{date_point}] ❌ 回溯失败 (用时: {elapsed:.2f}秒)")
-                    # 记录失败的日期点
-                    failed_date_points.append(date_point)
-                    
-                    # 确定应该执行的任务集合
-                    tasks_to_execute = set()
-                    
-                    # 如果指定了特定任务
-                    if task_ids:
-                        tasks_to_execute = set(task_ids)
-                    # 如果从特定任务开始
-                    elif start_from:
-                        # 获取start_from及其所有下游任务
-                        downstream_tasks = workflow.dag._get_downstream_tasks(start_from)
-                        downstream_tasks.add(start_from)
-                        tasks_to_execute = downstream_tasks
-                    # 如果执行全部任务
-                    else:
-                        tasks_to_execute = set(workflow.dag.tasks.keys())
-                    
-                    # 获取已完成任务
-                    completed_task_ids = set(workflow.execution_history[-1].get("completed_tasks", []))
-                    
-                    # 获取失败任务
-                    failed_task_id = workflow.execution_history[-1].get("failed_task_id")
-                    failed_task_ids = set([failed_task_id]) if failed_task_id else set()
-                    
-                    # 计算未完成任务ID
-                    uncompleted_task_ids = tasks_to_execute - completed_task_ids
-                    if failed_task_id:
-                        uncompleted_task_ids -= failed_task_ids
-                    
-                    # 显示未完成任务信息
-                    print("\n任务执行摘要:")
-                    print(f"已完成任务: {', '.join(sorted(completed_task_ids)) if completed_task_ids else '无'}")
-                    print(f"失败任务: {', '.join(sorted(failed_task_ids)) if failed_task_ids else '无'}")
-                    if uncompleted_task_ids:
-                        print(f"未执行任务: {', '.join(sorted(uncompleted_task_ids))}")
-                        print("原因: 由于上游任务失败，这些任务未被执行")
-            except Exception as e:
-                failure_count += 1
-                print(f"[{date_point}] ❌ 回溯失败: {str(e)}")
-                # 记录失败的日期点和错误信息
-                failed_date_points.append(date_point)
-        else:
-            print(f"[{date_point}] 空运行，跳过实际执行")
-            # 如果是空运行，显示将要传递的参数
-            print(f"  将传递以下参数:")
-            for key, value in day_params.items():
-                print(f"  - {key}: {value}")
-    
+                    tasks_to_execute = set(workflow.dag.tasks.keys())
+                
+                # 获取已完成任务
+                completed_task_ids = set(workflow.execution_history[-1].get("completed_tasks", []))
+                
+                # 获取失败任务
+                failed_task_id = workflow.execution_history[-1].get("failed_task_id")
+                failed_task_ids = set([failed_task_id]) if failed_task_id else set()
+                
+                # 计算未完成任务ID
+                uncompleted_task_ids = tasks_to_execute - completed_task_ids
+                if failed_task_id:
+                    uncompleted_task_ids -= failed_task_ids
+                
+                # 显示未完成任务信息
+                print("\n任务执行摘要:")
+                print(f"已完成任务: {', '.join(sorted(completed_task_ids)) if completed_task_ids else '无'}")
+                print(f"失败任务: {', '.join(sorted(failed_task_ids)) if failed_task_ids else '无'}")
+                if uncompleted_task_ids:
+                    print(f"未执行任务: {', '.join(sorted(uncompleted_task_ids))}")
+                    print("原因: 由于上游任务失败，这些任务未被执行")
+                return False
+        except Exception as e:
+            print(f"[{date_point}] ❌ 回溯失败: {str(e)}")
+            return False
+
+    # 各日期点的回溯互相独立（独立的配置副本和参数），可以并行执行；
+    # 任务实际在子进程中运行，线程池即可获得并行收益，也避免进程池的pickle限制
+    parallelism = int(backfill_config.get("parallelism", 1) or 1)
+    if parallelism > 1:
+        print(f"\n启用并行回溯，最大并发日期数: {parallelism}")
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            outcomes = list(executor.map(_run_single_date, range(len(date_range)), date_range))
+    else:
+        outcomes = [_run_single_date(i, d) for i, d in enumerate(date_range)]
+
+    # 汇总各日期点结果
+    for date_point, outcome in zip(date_range, outcomes):
+        if outcome is True:
+            success_count += 1
+        elif outcome is False:
+            failure_count += 1
+            failed_date_points.append(date_point)
+
     # 汇总结果
     total_elapsed = time.time() - total_start_time
     print(f"\n回溯执行完成:")
@@ -728,7 +912,7 @@ def run_backfill(config_path, backfill_params_path, job_ids=None, start_from=Non
             # 如果需要重新执行失败的日期点，提供命令示例
             if len(failed_date_points) > 0:
                 print("\n要重新执行失败的日期点，可以使用以下命令:")
-                backfill_params_path_base = os.path.basename(backfill_params_path)
+                backfill_params_path_base = os.path.basename(backfill_params_path) if backfill_params_path else "backfill_params.json"
                 failed_params_path = f"{os.path.splitext(backfill_params_path_base)[0]}_failed.json"
                 print(f"""
 创建包含以下内容的文件 {failed_params_path}:
@@ -745,7 +929,13 @@ python scheduler_cli.py backfill --config {config_path} --backfill_params {faile
         return failure_count == 0
     else:
         print("这是一次空运行，未实际执行任务")
-        return True
+        # 空运行返回预检报告：调用方可在发起真实回溯前检查errors，
+        # resolved_params为已物化的逐日期参数行，可直接复查
+        return {
+            "errors": validation_errors,
+            "warnings": validation_warnings,
+            "resolved_params": date_param_rows
+        }
 
 
 def visualize_workflow(config_path, output_path=None, params_path=None):
@@ -23,6 +23,7 @@
 import os
 import sys
 import tempfile
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -329,7 +330,138 @@ class TestWorkflow(unittest.TestCase):
         history = workflow.get_execution_history()
         self.assertEqual(len(history), 1)
         self.assertEqual(history[0]["status"], "SUCCESS")
-        
+
+
+class TestWorkflowEngine(unittest.TestCase):
+    """测试并行调度引擎"""
+
+    def test_parallel_execution_ordering(self):
+        """测试并行执行时依赖顺序仍然成立"""
+        workflow = Workflow("test_parallel", history_size=0)
+        events = []
+        events_lock = threading.Lock()
+        # 两个独立分支必须同时在执行才能一起通过屏障，
+        # 若调度退化为串行，wait会超时抛BrokenBarrierError导致任务失败
+        barrier = threading.Barrier(2)
+
+        def record(task_id, wait_barrier=False):
+            def func(**kwargs):
+                if wait_barrier:
+                    barrier.wait(timeout=10)
+                with events_lock:
+                    events.append(task_id)
+                return {"task_id": task_id}
+            return func
+
+        # 菱形依赖: a -> (b, c) -> d，b和c可并行
+        workflow.add_task(PythonTask("a", python_callable=record("a")))
+        workflow.add_task(PythonTask("b", python_callable=record("b", wait_barrier=True)))
+        workflow.add_task(PythonTask("c", python_callable=record("c", wait_barrier=True)))
+        workflow.add_task(PythonTask("d", python_callable=record("d")))
+        workflow.set_dependency("a", "b")
+        workflow.set_dependency("a", "c")
+        workflow.set_dependency("b", "d")
+        workflow.set_dependency("c", "d")
+
+        results = workflow.execute()
+
+        # 四个任务全部完成，且依赖顺序成立：a最先，d最后
+        self.assertEqual(len(results), 4)
+        self.assertEqual(events[0], "a")
+        self.assertEqual(events[-1], "d")
+        # d能拿到两个直接上游的结果
+        self.assertEqual(results["d"]["task_id"], "d")
+
+    def test_fail_fast_false_continues(self):
+        """测试fail_fast=False时失败不中断其他分支"""
+        workflow = Workflow("test_fail_fast", history_size=0)
+        workflow.set_fail_fast(False)
+
+        def fail_func(**kwargs):
+            raise RuntimeError("预期内的失败")
+
+        # 失败分支与独立分支并存
+        workflow.add_task(PythonTask("bad", python_callable=fail_func, max_retries=0))
+        workflow.add_task(PythonTask("good", python_callable=lambda **kw: {"ok": True}))
+
+        results = workflow.execute()
+
+        # 失败任务没有结果，独立分支照常完成
+        self.assertNotIn("bad", results)
+        self.assertIn("good", results)
+        self.assertTrue(results["good"]["ok"])
+
+    def test_fail_fast_true_raises(self):
+        """测试fail_fast=True（默认）时失败立即抛出"""
+        workflow = Workflow("test_fail_fast_true", history_size=0)
+
+        def fail_func(**kwargs):
+            raise RuntimeError("预期内的失败")
+
+        workflow.add_task(PythonTask("bad", python_callable=fail_func, max_retries=0))
+
+        with self.assertRaises(RuntimeError):
+            workflow.execute()
+
+    def test_cycle_detection(self):
+        """测试环路在调度前被拒绝"""
+        workflow = Workflow("test_cycle", history_size=0)
+        workflow.add_task(PythonTask("a", python_callable=lambda **kw: 1))
+        workflow.add_task(PythonTask("b", python_callable=lambda **kw: 2))
+        workflow.set_dependency("a", "b")
+        workflow.set_dependency("b", "a")
+
+        with self.assertRaises(ValueError):
+            workflow.execute()
+
+    def test_memoize_hit_and_invalidation(self):
+        """测试结果缓存命中与参数变化后失效"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            call_count = {"n": 0}
+
+            def counted(**kwargs):
+                call_count["n"] += 1
+                return {"n": call_count["n"]}
+
+            workflow = Workflow("test_memoize", history_size=0)
+            workflow.set_memoize(True, cache_dir=cache_dir)
+            task = PythonTask("t", python_callable=counted, params={"day_id": "20250101"})
+            workflow.add_task(task)
+
+            # 首次执行真正运行任务
+            results = workflow.execute()
+            self.assertEqual(results["t"]["n"], 1)
+
+            # 输入未变化，第二次执行命中缓存，函数不再被调用
+            results = workflow.execute()
+            self.assertEqual(results["t"]["n"], 1)
+            self.assertEqual(call_count["n"], 1)
+
+            # 参数变化后缓存失效，任务重新执行
+            task.set_param("day_id", "20250102")
+            results = workflow.execute()
+            self.assertEqual(call_count["n"], 2)
+
+    def test_history_bounded(self):
+        """测试执行历史按history_size截断"""
+        workflow = Workflow("test_history", history_size=3)
+        workflow.add_task(PythonTask("t", python_callable=lambda **kw: {"ok": True}))
+
+        for _ in range(5):
+            workflow.execute()
+
+        # 只保留最近3条记录
+        history = workflow.get_execution_history()
+        self.assertEqual(len(history), 3)
+        for record in history:
+            self.assertEqual(record["status"], "SUCCESS")
+
+        # history_size=0时不记录历史
+        workflow_no_history = Workflow("test_no_history", history_size=0)
+        workflow_no_history.add_task(PythonTask("t", python_callable=lambda **kw: 1))
+        workflow_no_history.execute()
+        self.assertEqual(len(workflow_no_history.get_execution_history()), 0)
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file